@@ -5,6 +5,7 @@ import typing
 from tonsdk.utils import Address, InvalidAddressError, b64str_to_bytes
 from tonsdk.boc import Cell, Slice
 from .utils import transaction_status, known_prefixes
+from .local import run_local_get_method
 
 
 def isBase64(sb):
@@ -29,14 +30,57 @@ def is_boc(b64str: str):
         return False
 
 
+_not_loaded = object()
+
+
 class Msg:
+    """
+    msg_data, op_code and parsed body cell are computed on first access
+    """
+    __slots__ = ('created_lt', 'source', 'destination', 'value', '_raw_msg_data', '_msg_data', '_op_code', '_cell')
+
     def __init__(self, data: dict):
         self.created_lt = data['created_lt']
         self.source = data['source']
         self.destination = data['destination']
         self.value = data['value']
-        self.msg_data = base64.b64decode(data['msg_data']).decode().split('\x00')[-1] if not is_boc(data['msg_data']) else data['msg_data']
-        self.op_code = self.try_get_op() if 'op_code' not in data else data['op_code']
+        self._raw_msg_data = data['msg_data']
+        self._msg_data = _not_loaded
+        self._op_code = data['op_code'] if 'op_code' in data else _not_loaded
+        self._cell = _not_loaded
+
+    @property
+    def cell(self) -> typing.Optional[Cell]:
+        """
+        parsed message body or None if body is a text comment, don't modify it
+        """
+        if self._cell is _not_loaded:
+            try:
+                self._cell = Cell.one_from_boc(b64str_to_bytes(self._raw_msg_data))
+            except:
+                self._cell = None
+        return self._cell
+
+    @property
+    def msg_data(self) -> str:
+        if self._msg_data is _not_loaded:
+            self._msg_data = base64.b64decode(self._raw_msg_data).decode().split('\x00')[-1] if self.cell is None else self._raw_msg_data
+        return self._msg_data
+
+    @msg_data.setter
+    def msg_data(self, value: str):
+        self._raw_msg_data = self._msg_data = value
+        self._cell = self._op_code = _not_loaded
+
+    @property
+    def op_code(self):
+        if self._op_code is _not_loaded:
+            self._op_code = self.try_get_op()
+        return self._op_code
+
+    @op_code.setter
+    def op_code(self, value):
+        self._op_code = value
 
     def try_detect_type(self):
         op = self.try_get_op()
@@ -45,10 +89,10 @@ class Msg:
     def try_get_op(self):
         if not self.msg_data:
             return None
-        if not is_boc(self.msg_data):
+        if self.cell is None:
             op = '000000'
         else:
-            slice = Cell.one_from_boc(b64str_to_bytes(self.msg_data)).begin_parse()
+            slice = self.cell.begin_parse()
             if len(slice) >= 32:
                 op = slice.read_bytes(4).hex()
             else:
@@ -67,6 +111,7 @@ class Msg:
 
 
 class InMsg(Msg):
+    __slots__ = ()
 
     def is_external(self) -> bool:
         if not self.source:
@@ -75,19 +120,54 @@ class InMsg(Msg):
 
 
 class OutMsg(Msg):
-    pass
+    __slots__ = ()
 
 
 class Transaction:
+    """
+    status and messages are built on first access
+    """
+    __slots__ = ('utime', 'fee', 'data', 'hash', 'lt', '_status', '_in_msg', '_out_msgs')
+
     def __init__(self, data: dict):
         self.utime = data['utime']
         self.fee = data['fee']
         self.data = data['data']
         self.hash = data['hash']
         self.lt = data['lt']
-        self.status = transaction_status(data['data']) if 'status' not in data else data['status']
-        self.in_msg: InMsg = InMsg(data['in_msg'])
-        self.out_msgs: typing.List[OutMsg] = [OutMsg(out_msg) for out_msg in data['out_msgs']]
+        self._status = data['status'] if 'status' in data else _not_loaded
+        self._in_msg = data['in_msg']  # dict until first access
+        self._out_msgs = data['out_msgs']
+
+    @property
+    def status(self) -> bool:
+        if self._status is _not_loaded:
+            self._status = transaction_status(self.data)
+        return self._status
+
+    @status.setter
+    def status(self, value: bool):
+        self._status = value
+
+    @property
+    def in_msg(self) -> InMsg:
+        if isinstance(self._in_msg, dict):
+            self._in_msg = InMsg(self._in_msg)
+        return self._in_msg
+
+    @in_msg.setter
+    def in_msg(self, value: InMsg):
+        self._in_msg = value
+
+    @property
+    def out_msgs(self) -> typing.List[OutMsg]:
+        if self._out_msgs and isinstance(self._out_msgs[0], dict):
+            self._out_msgs = [OutMsg(out_msg) for out_msg in self._out_msgs]
+        return self._out_msgs
+
+    @out_msgs.setter
+    def out_msgs(self, value: typing.List[OutMsg]):
+        self._out_msgs = value
 
     def to_dict(self):
         return {
@@ -135,19 +215,37 @@ class ContractError(BaseException):
 
 
 class Contract:
+    local_state_ttl = 10  # seconds to reuse fetched code and data for local get methods
+
     def __init__(self, address, provider):
         Address(address)  # raises tonsdk.utils.InvalidAddressError if address is not valid
         self.address = address
         self.provider = provider
+        self.local_state = None
 
     async def get_transactions(self, limit: int = 10**9, limit_per_one_request: int = 100)  -> typing.List[Transaction]:
         return await self.provider.get_transactions(self.address, limit, limit_per_one_request)
 
-    async def run_get_method(self, method: str, stack: list):  # TonCenterClient or LsClient required
+    def iter_transactions(self, since_lt: int = 0, until_lt: int = None, limit: int = None, limit_per_one_request: int = 100):  # TonCenterClient, TonApiClient or LsClient required
+        """
+        async for tr in contract.iter_transactions(since_lt=last_seen_lt):
+        """
+        return self.provider.iter_transactions(self.address, since_lt, until_lt, limit, limit_per_one_request)
+
+    def iter_transaction_batches(self, since_lt: int = 0, until_lt: int = None, limit: int = None, limit_per_one_request: int = 100,
+                                 batch_size: int = 10000, format: str = 'numpy'):  # numpy (and pyarrow for format='arrow') required
+        return self.provider.iter_transaction_batches(self.address, since_lt, until_lt, limit, limit_per_one_request, batch_size, format)
+
+    async def run_get_method(self, method: str, stack: list, local: bool = False):  # TonCenterClient or LsClient required
         """
         Please, note that currently the response types for TonCenterClient, LsClient and DtonClient are different.
         Will be improved in future versions.
+
+        local=True runs supported get methods (see Contracts.local.local_get_methods) on fetched code and data without
+        network requests, stack and result are lists of python values, e.g. await collection.run_get_method('get_nft_address_by_index', [5], local=True)
         """
+        if local:
+            return await run_local_get_method(self, method, stack, self.local_state_ttl)
         return await self.provider.run_get_method(method=method, address=self.address, stack=stack)
 
     async def get_balance(self):  # returns nanoTons
@@ -1,6 +1,12 @@
+import asyncio
 import json
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
 
+from tonsdk.utils import Address
 from .Contract import Contract
+from .utils import get_jetton_wallet_addresses, jetton_wallet_layouts
 
 
 class JettonError(BaseException):
@@ -8,8 +14,14 @@ class JettonError(BaseException):
 
 
 class Jetton(Contract):
+    # LRU of (raw master address, testnet): (jetton wallet code, jetton wallet data layout or False if wallet addresses can't be computed locally)
+    jetton_wallets_cache = OrderedDict()
+    jetton_wallets_cache_size = 10000  # jetton masters kept in jetton_wallets_cache
+
     def __init__(self, data, provider):
         self.provider = provider
+        self.jetton_wallet_code = None
+        self.jetton_wallet_layout = None
         if isinstance(data, str):
             super().__init__(data, provider)
             self.address = data
@@ -25,6 +37,7 @@ class Jetton(Contract):
             self.description = data['description']
             self.image = data['image'] if 'image' in data else data.get('image_data')
             self.token_supply = self.supply / 10 ** self.decimals
+            self.jetton_wallet_code = data.get('jetton_wallet_code')
 
     def is_full(self):
         return self.full_data
@@ -40,11 +53,70 @@ class Jetton(Contract):
         self.description = jetton.description
         self.image = jetton.image
         self.token_supply = jetton.token_supply
+        self.jetton_wallet_code = jetton.jetton_wallet_code
 
     async def get_jetton_wallet(self, owner_address: str): # TonCenterClient or LsClient required
-        jetton_wallet_address = await self.provider.get_jetton_wallet_address(self.address, owner_address)
+        jetton_wallet_address = await self.get_jetton_wallet_address(owner_address)
         return JettonWallet(jetton_wallet_address, self.provider)
 
+    async def load_jetton_wallet_code(self):  # TonCenterClient, LsClient or DtonClient required
+        """
+        Gets jetton wallet code from get_jetton_data once per jetton master and finds wallet data layout
+        comparing locally computed address of one wallet with get_wallet_address.
+        Returns True if jetton wallet addresses can be computed locally.
+        """
+        key = (Address(self.address).to_string(False), getattr(self.provider, 'testnet', False))
+        if key not in Jetton.jetton_wallets_cache:
+            if self.jetton_wallet_code is None:
+                if not hasattr(self.provider, 'run_get_method_stack'):
+                    return False  # e.g. TonApiClient
+                # get_jetton_data: total_supply mintable admin_address content jetton_wallet_code, without off-chain metadata of update()
+                data = await self.provider.run_get_method_stack(method='get_jetton_data', address=self.address, stack=[])
+                self.jetton_wallet_code = data.boc(4)
+            if not self.jetton_wallet_code:
+                return False  # not cached, the code can be got through another provider
+            layout = False
+            sample_owner = self.address
+            remote_address = Address(await self.provider.get_jetton_wallet_address(self.address, sample_owner)).to_string(False)
+            for layout_name in jetton_wallet_layouts:
+                try:
+                    local_address = get_jetton_wallet_addresses(self.jetton_wallet_code, self.address, [sample_owner], layout_name, Address(self.address).wc)[0]
+                except Exception:  # e.g. unsupported exotic cell in code
+                    break
+                if Address(local_address).to_string(False) == remote_address:
+                    layout = layout_name
+                    break
+            Jetton.jetton_wallets_cache[key] = (self.jetton_wallet_code, layout)
+            while len(Jetton.jetton_wallets_cache) > Jetton.jetton_wallets_cache_size:
+                Jetton.jetton_wallets_cache.popitem(last=False)
+        Jetton.jetton_wallets_cache.move_to_end(key)
+        self.jetton_wallet_code, self.jetton_wallet_layout = Jetton.jetton_wallets_cache[key]
+        return bool(self.jetton_wallet_layout)
+
+    async def get_jetton_wallet_address(self, owner_address: str):
+        return (await self.get_jetton_wallet_addresses([owner_address]))[0]
+
+    async def get_jetton_wallet_addresses(self, owners: list, processes: int = 0):
+        """
+        Computes jetton wallet addresses locally if possible (see .load_jetton_wallet_code()), otherwise runs get_wallet_address for each owner.
+        Use processes to compute addresses in a process pool for huge lists of owners.
+        """
+        if not await self.load_jetton_wallet_code():
+            return await asyncio.gather(*[self.provider.get_jetton_wallet_address(self.address, owner) for owner in owners])
+        wc = Address(self.address).wc
+        if not processes or len(owners) < 10000:
+            addresses = get_jetton_wallet_addresses(self.jetton_wallet_code, self.address, owners, self.jetton_wallet_layout, wc)
+        else:
+            loop = asyncio.get_running_loop()
+            chunk_size = ceil(len(owners) / (processes * 4))
+            with ProcessPoolExecutor(processes) as pool:
+                chunks = await asyncio.gather(*[
+                    loop.run_in_executor(pool, get_jetton_wallet_addresses, self.jetton_wallet_code, self.address, owners[i:i + chunk_size], self.jetton_wallet_layout, wc)
+                    for i in range(0, len(owners), chunk_size)
+                ])
+            addresses = [address for chunk in chunks for address in chunk]
+        return [self.provider._process_address(address) for address in addresses]
+
     def to_dict(self):
         if self.is_full():
             return {
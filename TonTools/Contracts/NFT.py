@@ -1,7 +1,12 @@
+import asyncio
 import json
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
 
-from tonsdk.utils import Address, InvalidAddressError
+from tonsdk.boc import Cell
+from tonsdk.utils import Address, InvalidAddressError, b64str_to_bytes, bytes_to_b64str
 from ..Contracts.Contract import Contract
+from .utils import get_nft_item_addresses
 
 
 class NftCollectionError(BaseException):
@@ -81,6 +86,7 @@ class NftItem(Contract):
 class NftCollection(Contract):
     def __init__(self, data, provider):
         self.provider = provider
+        self.nft_item_code = None  # b64 boc of nft item code if item addresses can be computed locally, False if they can't
         if isinstance(data, str):
             super().__init__(data, provider)
             self.address = data
@@ -109,9 +115,74 @@ class NftCollection(Contract):
         self.metadata = collection.metadata
         self.owner = collection.owner
 
-    async def get_collection_items(self, limit_per_one_request=0):
+    async def get_collection_items(self, limit_per_one_request=0, local: bool = False, processes: int = 0):
+        """
+        with local=True item addresses are computed from nft item code (1-2 requests) if the collection is standard,
+        use processes to compute them in a process pool for huge collections
+        """
+        if local and await self.load_nft_item_code():
+            if not self.is_full():
+                await self.update()
+            addresses = await self.get_nft_item_addresses(range(self.next_item_index), processes)
+            result = []
+            for index, address in enumerate(addresses):
+                item = NftItem(address, self.provider)
+                item.index = index
+                result.append(item)
+            return result
         return await self.provider.get_collection_items(self, limit_per_one_request)
 
+    async def load_nft_item_code(self):  # TonCenterClient or LsClient required
+        """
+        Gets nft item code from collection data once and compares locally computed address of the first item with get_nft_address_by_index.
+        Returns True if item addresses can be computed locally, False for other providers.
+        """
+        if not hasattr(self.provider, 'get_code_and_data') or not hasattr(self.provider, 'get_nft_address_by_index'):
+            return False  # e.g. TonApiClient
+        if self.nft_item_code is None:
+            self.nft_item_code = False
+            try:
+                state = await self.provider.get_code_and_data(self.address)
+                try:
+                    # standard collection data: owner_address next_item_index content nft_item_code royalty_params
+                    item_code = Cell.one_from_boc(b64str_to_bytes(state['data'])).refs[1]
+                except Exception:
+                    return False
+                local_address = get_nft_item_addresses(item_code, self.address, [0], Address(self.address).wc)[0]
+                remote_address = await self.provider.get_nft_address_by_index(self.address, 0)
+            except BaseException:
+                self.nft_item_code = None  # request failed, check again next time
+                raise
+            if Address(local_address).to_string(False) == Address(remote_address).to_string(False):
+                self.nft_item_code = bytes_to_b64str(item_code.to_boc(False))
+        return bool(self.nft_item_code)
+
+    async def get_nft_item_addresses(self, indexes: range, processes: int = 0):
+        """
+        Computes item addresses locally if possible (see .load_nft_item_code()), otherwise runs get_nft_address_by_index for each index.
+        """
+        if not await self.load_nft_item_code():
+            if not hasattr(self.provider, 'get_nft_address_by_index'):
+                raise NftCollectionError(f'{type(self.provider).__name__} can\'t get nft item addresses by index, use TonCenterClient or LsClient')
+            return await asyncio.gather(*[self.provider.get_nft_address_by_index(self.address, i) for i in indexes])
+        wc = Address(self.address).wc
+        if not processes or len(indexes) < 10000:
+            addresses = get_nft_item_addresses(self.nft_item_code, self.address, indexes, wc)
+        else:
+            loop = asyncio.get_running_loop()
+            chunk_size = ceil(len(indexes) / (processes * 4))
+            with ProcessPoolExecutor(processes) as pool:
+                chunks = await asyncio.gather(*[
+                    loop.run_in_executor(pool, get_nft_item_addresses, self.nft_item_code, self.address, indexes[i:i + chunk_size], wc)
+                    for i in range(0, len(indexes), chunk_size)
+                ])
+            addresses = [address for chunk in chunks for address in chunk]
+        return [self.provider._process_address(address) for address in addresses]
+
+    async def iter_collection_items(self, start_index: int = 0, max_in_flight: int = 100, ordered: bool = True):  # TonCenterClient or LsClient required
+        async for item in self.provider.iter_collection_items(self, start_index, max_in_flight, ordered):
+            yield item
+
     def to_dict(self):
         if self.is_full():
             return {
@@ -1,7 +1,18 @@
+import abc
+import asyncio
+import collections
+import decimal
+import random
+import time
+import typing
+
 import tonsdk
-from tonsdk.utils import Address, InvalidAddressError
+from tonsdk.boc import Cell, begin_cell, begin_dict
+from tonsdk.utils import Address, InvalidAddressError, sign_message
+from tonsdk.contract import Contract as SdkContract
 from tonsdk.contract.wallet import WalletVersionEnum, Wallets
 from ..Contracts.Contract import Contract
+from ..Providers.cache import RequestCoalescer
 from tonsdk.utils import bytes_to_b64str
 import tonsdk.contract.token.ft
 from tonsdk.contract.token.nft import NFTItem
@@ -10,113 +21,488 @@ class WalletError(BaseException):
     pass
 
 
+def _is_rejected(response) -> bool:
+    # TonCenterClient and TonApiClient return http status of sendBoc instead of raising
+    return isinstance(response, int) and response != 200
+
+
+async def _last_transaction_lt(contract) -> int:
+    async for tr in contract.iter_transactions(limit=1):
+        return int(tr.lt)
+    return 0
+
+
+class KeyHandle(abc.ABC):
+    """
+    Signs wallet messages. Subclass it and pass to Wallet(key_handle=...) to keep the private key out of the process (e.g. in HSM or KMS)
+    """
+    public_key: bytes
+
+    @abc.abstractmethod
+    def sign(self, data: bytes) -> bytes:
+        """
+        ed25519 signature (64 bytes) of data
+        """
+
+
+class PrivateKeyHandle(KeyHandle):
+    def __init__(self, public_key: bytes, private_key: bytes):
+        self.public_key = public_key
+        self._private_key = private_key
+
+    def sign(self, data: bytes) -> bytes:
+        return sign_message(data, self._private_key).signature
+
+
+class TonTransfer:
+    def __init__(self, destination_address: str, amount: float, message: str = '', send_mode: int = 3):
+        self.destination_address = destination_address
+        self.amount = amount
+        self.message = message
+        self.send_mode = send_mode
+
+    async def create_order(self, wallet):
+        """
+        (destination, nanotons, payload, send mode) of internal message sent by wallet
+        """
+        return self.destination_address, tonsdk.utils.to_nano(self.amount, 'ton'), self.message, self.send_mode
+
+
+class JettonTransfer:
+    def __init__(self, destination_address: str, jettons_amount: float,
+                 jetton_master_address: str = None,  # jetton wallet and decimals are requested from provider
+                 jetton_wallet: str = None,  # or jetton wallet of sender with decimals of the jetton
+                 fee: float = 0.06, decimals: int = 9):
+        if jetton_master_address is None and jetton_wallet is None:
+            raise WalletError('specify jetton_master_address or jetton_wallet')
+        self.destination_address = destination_address
+        self.jettons_amount = jettons_amount
+        self.jetton_master_address = jetton_master_address
+        self.jetton_wallet = jetton_wallet
+        self.fee = fee
+        self.decimals = decimals
+
+    async def create_order(self, wallet):
+        jetton_wallet, decimals = self.jetton_wallet, self.decimals
+        if jetton_wallet is None:
+            jetton = await wallet.provider.get_jetton_data(self.jetton_master_address)
+            decimals = jetton.decimals
+            jetton_wallet = (await jetton.get_jetton_wallet(wallet.address)).address
+        body = tonsdk.contract.token.ft.JettonWallet().create_transfer_body(
+            Address(self.destination_address),
+            self.jettons_amount * 10**decimals
+        )
+        return jetton_wallet, tonsdk.utils.to_nano(self.fee, "ton"), body, 3
+
+
+class NftTransfer:
+    def __init__(self, destination_address: str, nft_address: str, fee: float = 0.02):
+        self.destination_address = destination_address
+        self.nft_address = nft_address
+        self.fee = fee
+
+    async def create_order(self, wallet):
+        body = NFTItem().create_transfer_body(
+            Address(self.destination_address)
+        )
+        return self.nft_address, tonsdk.utils.to_nano(self.fee, "ton"), body, 3
+
+
 class Wallet(Contract):
-    def __init__(self, provider, address: str = None, mnemonics: list = None, version='v4r2'):
+    max_messages = 4  # internal messages in one external message
+
+    def __init__(self, provider, address: str = None, mnemonics: list = None, version='v4r2',
+                 key_handle: KeyHandle = None  # signs messages instead of keys derived from mnemonics
+                 ):
         self.provider = provider
+        self.key_handle = None
+        self._wallet = None  # tonsdk wallet, keys are derived from mnemonics only once
         if address:
             self.address = address
             self.full_data = False
         if mnemonics:
-            mnemonics, _pub_k, _priv_k, wallet = Wallets.from_mnemonics(mnemonics, WalletVersionEnum(version), 0)
+            mnemonics, pub_k, priv_k, wallet = Wallets.from_mnemonics(mnemonics, WalletVersionEnum(version), 0)
             self.mnemonics = mnemonics
             self.version = version
-            self.address = self.provider._process_address(wallet.address.to_string())
-            self.full_data = True
-        if not address and not mnemonics:
-            mnemonics, _pub_k, _priv_k, wallet = Wallets.create(WalletVersionEnum(version), 0)
+            self._set_wallet(wallet, key_handle or PrivateKeyHandle(pub_k, priv_k))
+        elif key_handle:
+            self.version = version
+            self._set_wallet(Wallets.ALL[WalletVersionEnum(version)](public_key=key_handle.public_key, private_key=None, wc=0), key_handle)
+        if not address and not mnemonics and not key_handle:
+            mnemonics, pub_k, priv_k, wallet = Wallets.create(WalletVersionEnum(version), 0)
             self.mnemonics = mnemonics
             self.version = version
-            self.address = self.provider._process_address(wallet.address.to_string())
-            self.full_data = True
+            self._set_wallet(wallet, PrivateKeyHandle(pub_k, priv_k))
         super().__init__(self.address, provider)
 
+    def _set_wallet(self, wallet, key_handle: KeyHandle):
+        self._wallet = wallet
+        self.key_handle = key_handle
+        self.address = self.provider._process_address(wallet.address.to_string())
+        self.full_data = True
+
+    def _sign(self, signing_message: Cell) -> Cell:
+        # body of external message: signature by key_handle and signing message
+        signature = self.key_handle.sign(bytes(signing_message.bytes_hash()))
+        body = Cell()
+        body.bits.write_bytes(signature)
+        body.write_cell(signing_message)
+        return body
+
+    def _create_external_message(self, body: Cell, state_init: Cell = None) -> Cell:
+        # same as tonsdk WalletContract.create_external_message for body signed by _sign
+        header = SdkContract.create_external_message_header(self._wallet.address)
+        return SdkContract.create_common_msg_info(header, state_init, body)
+
+    @staticmethod
+    def _create_order(to_addr: str, amount: int, payload=None) -> Cell:
+        # same as internal message of tonsdk WalletContract.create_transfer_message
+        payload_cell = Cell()
+        if isinstance(payload, Cell):
+            payload_cell = payload
+        elif isinstance(payload, str) and payload:
+            payload_cell.bits.write_uint(0, 32)
+            payload_cell.bits.write_string(payload)
+        elif payload:
+            payload_cell.bits.write_bytes(payload)
+        header = SdkContract.create_internal_message_header(Address(to_addr), decimal.Decimal(amount))
+        return SdkContract.create_common_msg_info(header, None, payload_cell)
+
+    def _create_signing_message(self, orders: list, seqno: int) -> Cell:
+        """
+        signing message with internal messages for orders: [(destination, nanotons, payload, send mode), ...]
+        """
+        signing_message = self._wallet.create_signing_message(seqno)
+        for to_addr, amount, payload, send_mode in orders:
+            signing_message.bits.write_uint8(send_mode)
+            signing_message.refs.append(self._create_order(to_addr, amount, payload))
+        return signing_message
+
+    def _create_batch_message(self, orders: list, seqno: int) -> Cell:
+        """
+        external message with internal messages for orders, wallet is deployed by the message with seqno 0
+        """
+        body = self._sign(self._create_signing_message(orders, seqno))
+        return self._create_external_message(body, self._wallet.create_state_init()['state_init'] if seqno == 0 else None)
+
     def has_access(self):
         return self.full_data
 
     async def get_seqno(self):
         return await self.provider.get_wallet_seqno(self.address)
 
-    async def transfer_ton(self, destination_address: str, amount: float, message: str = '', send_mode: int = 3):
+    async def transfer_batch(self, transfers: list):
+        """
+        sends TonTransfer, JettonTransfer and NftTransfer (up to max_messages) in one external message with one seqno
+        """
         if not self.has_access():
-            raise WalletError('Cannot send tons from wallet without wallet mnemonics\nCreate wallet like Wallet(mnemonics=["your", "mnemonic", "here"...], version="your_wallet_version")')
-        mnemonics, _pub_k, _priv_k, wallet = Wallets.from_mnemonics(self.mnemonics, WalletVersionEnum(self.version), 0)
-        seqno = await self.get_seqno()
-        query = wallet.create_transfer_message(to_addr=destination_address,
-                                               amount=tonsdk.utils.to_nano(amount, 'ton'),
-                                               seqno=seqno, payload=message, send_mode=send_mode)
-        boc = bytes_to_b64str(query["message"].to_boc(False))
+            raise WalletError('Cannot send from wallet without wallet mnemonics\nCreate wallet like Wallet(mnemonics=["your", "mnemonic", "here"...], version="your_wallet_version")')
+        if not 0 < len(transfers) <= self.max_messages:
+            raise WalletError(f'{self.version} wallet can send from 1 to {self.max_messages} messages at once, got {len(transfers)}')
+        seqno, *orders = await asyncio.gather(self.get_seqno(), *[transfer.create_order(self) for transfer in transfers])
+        boc = bytes_to_b64str(self._create_batch_message(orders, seqno).to_boc(False))
         response = await self.provider.send_boc(boc)
         return response
 
+    async def transfer_ton(self, destination_address: str, amount: float, message: str = '', send_mode: int = 3):
+        if not self.has_access():
+            raise WalletError('Cannot send tons from wallet without wallet mnemonics\nCreate wallet like Wallet(mnemonics=["your", "mnemonic", "here"...], version="your_wallet_version")')
+        return await self.transfer_batch([TonTransfer(destination_address, amount, message, send_mode)])
+
     async def transfer_jetton_by_jetton_wallet(self, destination_address: str, jetton_wallet: str, jettons_amount: float, fee: float = 0.06, decimals: int = 9):
         """
         Better to use .transfer_jetton().
         """
         if not self.has_access():
             raise WalletError('Cannot send jettons from wallet without wallet mnemonics\nCreate wallet like Wallet(mnemonics=["your", "mnemonic", "here"...], version="your_wallet_version")')
-        mnemonics, _pub_k, _priv_k, wallet = Wallets.from_mnemonics(self.mnemonics, WalletVersionEnum(self.version), 0)
-        seqno = await self.get_seqno()
-        body = tonsdk.contract.token.ft.JettonWallet().create_transfer_body(
-            Address(destination_address),
-            jettons_amount * 10**decimals
-        )
-        query = wallet.create_transfer_message(
-            jetton_wallet,
-            tonsdk.utils.to_nano(fee, "ton"),
-            seqno,
-            payload=body
-        )
-
-        jettons_boc = bytes_to_b64str(query["message"].to_boc(False))
-        response = await self.provider.send_boc(jettons_boc)
-        return response
+        return await self.transfer_batch([JettonTransfer(destination_address, jettons_amount, jetton_wallet=jetton_wallet, fee=fee, decimals=decimals)])
 
     async def transfer_jetton(self, destination_address: str, jetton_master_address: str, jettons_amount: float, fee: float = 0.06):
         if not self.has_access():
             raise WalletError('Cannot send jettons from wallet without wallet mnemonics\nCreate wallet like Wallet(mnemonics=["your", "mnemonic", "here"...], version="your_wallet_version")')
-
-        mnemonics, _pub_k, _priv_k, wallet = Wallets.from_mnemonics(self.mnemonics, WalletVersionEnum(self.version), 0)
-        seqno = await self.get_seqno()
-        jetton = await self.provider.get_jetton_data(jetton_master_address)
-        body = tonsdk.contract.token.ft.JettonWallet().create_transfer_body(
-            Address(destination_address),
-            jettons_amount * 10**jetton.decimals
-        )
-        jetton_wallet = await jetton.get_jetton_wallet(self.address)
-        query = wallet.create_transfer_message(
-            jetton_wallet.address,
-            tonsdk.utils.to_nano(fee, "ton"),
-            seqno,
-            payload=body
-        )
-
-        jettons_boc = bytes_to_b64str(query["message"].to_boc(False))
-        response = await self.provider.send_boc(jettons_boc)
-        return response
+        return await self.transfer_batch([JettonTransfer(destination_address, jettons_amount, jetton_master_address=jetton_master_address, fee=fee)])
 
     async def deploy(self):
         if not self.has_access():
             raise WalletError('Cannot deploy wallet without wallet mnemonics\nCreate wallet like Wallet(mnemonics=["your", "mnemonic", "here"...], version="your_wallet_version")')
-        mnemonics, _pub_k, _priv_k, wallet = Wallets.from_mnemonics(self.mnemonics, WalletVersionEnum(self.version), 0)
-        query = wallet.create_init_external_message()
-        boc = bytes_to_b64str(query["message"].to_boc(False))
+        query = self._create_external_message(self._sign(self._wallet.create_signing_message(0)), self._wallet.create_state_init()['state_init'])
+        boc = bytes_to_b64str(query.to_boc(False))
         response = await self.provider.send_boc(boc)
         return response
 
     async def transfer_nft(self, destination_address: str, nft_address: str, fee: float = 0.02):
         if not self.has_access():
             raise WalletError('Cannot send nft from wallet without wallet mnemonics\nCreate wallet like Wallet(mnemonics=["your", "mnemonic", "here"...], version="your_wallet_version")')
-        mnemonics, _pub_k, _priv_k, wallet = Wallets.from_mnemonics(self.mnemonics, WalletVersionEnum(self.version), 0)
-        seqno = await self.get_seqno()
-        body = NFTItem().create_transfer_body(
-            Address(destination_address)
-        )
-        query = wallet.create_transfer_message(
-            nft_address,
-            tonsdk.utils.to_nano(fee, "ton"),
-            seqno,
-            payload=body
-        )
-        nft_boc = bytes_to_b64str(query["message"].to_boc(False))
-        response = await self.provider.send_boc(nft_boc)
+        return await self.transfer_batch([NftTransfer(destination_address, nft_address, fee)])
+
+
+class HighloadQueries:
+    """
+    Query ids of a highload wallet: valid_until << 32 | counter. Sent queries are outstanding until they are found
+    in wallet transactions (confirmed) or their valid_until has passed (expired)
+    """
+
+    def __init__(self, timeout: int = 60, max_results: int = 10000):
+        self.timeout = timeout  # seconds a query is valid
+        self._counter = random.getrandbits(32)  # other processes sending from the same wallet are unlikely to repeat ids
+        self.outstanding = {}  # query_id: future resolved with True (confirmed) or False (expired or rejected)
+        self.results = collections.OrderedDict()  # query_id: True or False for max_results last finished queries
+        self.max_results = max_results
+
+    def allocate(self) -> int:
+        self._counter = (self._counter + 1) % 2 ** 32
+        return (int(time.time()) + self.timeout) << 32 | self._counter
+
+    def add(self, query_id: int) -> asyncio.Future:
+        self.outstanding[query_id] = asyncio.get_running_loop().create_future()
+        return self.outstanding[query_id]
+
+    def _finish(self, query_id: int, result: bool):
+        future = self.outstanding.pop(query_id, None)
+        if future is None:
+            return
+        if not future.done():
+            future.set_result(result)
+        self.results[query_id] = result
+        if len(self.results) > self.max_results:
+            self.results.popitem(last=False)
+
+    def discard(self, query_id: int):
+        """
+        message with query_id wasn't accepted
+        """
+        self._finish(query_id, False)
+
+    def confirm(self, query_id: int):
+        self._finish(query_id, True)
+
+    def expire(self, now: float):
+        """
+        queries valid until earlier than now are failed
+        """
+        for query_id in [query_id for query_id in self.outstanding if query_id >> 32 < now]:
+            self._finish(query_id, False)
+
+
+class HighloadWallet(Wallet):
+    """
+    Highload wallet v2: messages are identified by query ids instead of seqno, so many of them can be sent at once
+    without waiting for each other and without get method requests. Transfer methods return query id of the sent message.
+    """
+    max_messages = 255
+    confirm_delay = 30  # seconds after valid_until of a query to wait for its transaction before considering it expired
+
+    def __init__(self, provider, address: str = None, mnemonics: list = None, version='hv2',
+                 key_handle: KeyHandle = None,  # signs messages instead of keys derived from mnemonics
+                 timeout: int = 60  # seconds a sent message is valid
+                 ):
+        super().__init__(provider, address, mnemonics, version, key_handle)
+        self.queries = HighloadQueries(timeout)
+        self._last_lt = None  # last checked wallet transaction, the latest one before the first send
+        self._sync_coalescer = RequestCoalescer()
+
+    async def get_seqno(self):
+        raise WalletError('highload wallet has no seqno, messages are identified by query ids')
+
+    def _create_signing_message(self, orders: list, query_id: int) -> Cell:
+        recipients = begin_dict(16)
+        for i, (to_addr, amount, payload, send_mode) in enumerate(orders):
+            recipients.store_cell(i, begin_cell().store_uint8(send_mode).store_ref(self._create_order(to_addr, amount, payload)).end_cell())
+        return self._wallet.create_signing_message(query_id).store_maybe_ref(recipients.end_cell()).end_cell()
+
+    def _create_batch_message(self, orders: list, query_id: int) -> Cell:
+        return self._create_external_message(self._sign(self._create_signing_message(orders, query_id)))
+
+    async def transfer_batch(self, transfers: list) -> int:
+        """
+        sends up to max_messages transfers in one external message and returns its query id, see wait_query
+        """
+        if not self.has_access():
+            raise WalletError('Cannot send from wallet without wallet mnemonics\nCreate wallet like HighloadWallet(mnemonics=["your", "mnemonic", "here"...])')
+        if not 0 < len(transfers) <= self.max_messages:
+            raise WalletError(f'highload wallet can send from 1 to {self.max_messages} messages at once, got {len(transfers)}')
+        orders = await asyncio.gather(*[transfer.create_order(self) for transfer in transfers])
+        await self._init_last_lt()
+        query_id = self.queries.allocate()
+        boc = bytes_to_b64str(self._create_batch_message(orders, query_id).to_boc(False))
+        self.queries.add(query_id)
+        try:
+            response = await self.provider.send_boc(boc)
+        except BaseException:
+            self.queries.discard(query_id)
+            raise
+        if _is_rejected(response):
+            self.queries.discard(query_id)
+            raise WalletError(f'message with query id {query_id} was rejected with status {response}')
+        return query_id
+
+    async def deploy(self):
+        if not self.has_access():
+            raise WalletError('Cannot deploy wallet without wallet mnemonics\nCreate wallet like HighloadWallet(mnemonics=["your", "mnemonic", "here"...])')
+        signing_message = self._wallet.create_signing_message(self.queries.allocate()).store_maybe_ref(None).end_cell()
+        query = self._create_external_message(self._sign(signing_message), self._wallet.create_state_init()['state_init'])
+        response = await self.provider.send_boc(bytes_to_b64str(query.to_boc(False)))
         return response
+
+    def _query_id(self, msg) -> typing.Optional[int]:
+        # external message body: signature (64 bytes), wallet_id (4 bytes), query_id (8 bytes), ...
+        cell = msg.cell
+        if msg.source or cell is None or cell.bits.length < 608:
+            return None
+        if int.from_bytes(cell.bits.array[64:68], 'big') != self._wallet.options['wallet_id']:
+            return None
+        return int.from_bytes(cell.bits.array[68:76], 'big')
+
+    async def _init_last_lt(self):
+        # transactions before the first send can't contain our queries, so they are never checked
+        if self._last_lt is None:
+            last_lt = await self._sync_coalescer.run('last_lt', _last_transaction_lt, self)
+            if self._last_lt is None:
+                self._last_lt = last_lt
+
+    async def sync_queries(self):
+        """
+        checks new wallet transactions: outstanding queries found in them are confirmed,
+        queries not found confirm_delay seconds after their valid_until are expired
+        """
+        await self._sync_coalescer.run('sync', self._sync_queries)
+
+    async def _sync_queries(self):
+        now = time.time()
+        await self._init_last_lt()
+        last_lt = self._last_lt
+        async for tr in self.iter_transactions(since_lt=self._last_lt):
+            last_lt = max(last_lt, int(tr.lt))
+            query_id = self._query_id(tr.in_msg)
+            if query_id is not None:
+                self.queries.confirm(query_id)
+        self._last_lt = last_lt
+        self.queries.expire(now - self.confirm_delay)
+
+    async def wait_query(self, query_id: int, poll_interval: float = 3) -> bool:
+        """
+        True when the message with query_id is processed, False if it was rejected or wasn't processed before expiration
+        """
+        if query_id in self.queries.results:
+            return self.queries.results[query_id]
+        future = self.queries.outstanding.get(query_id)
+        if future is None:
+            raise WalletError(f'query {query_id} is not outstanding')
+        while not future.done():
+            await self.sync_queries()
+            if not future.done():
+                await asyncio.wait([future], timeout=poll_interval)
+        return future.result()
+
+
+class SendQueue:
+    """
+    Sends transfers of a seqno wallet one external message after another without seqno get method requests:
+    seqno is requested once and incremented locally, transfers queued while a message is in flight are packed
+    into the next one (up to wallet.max_messages). Every message is confirmed by its transaction in the wallet,
+    seqno is requested again only after a gap: message wasn't accepted, expired or its seqno was used by another sender.
+    """
+    message_timeout = 60  # seconds tonsdk wallet messages are valid
+    confirm_delay = 30  # seconds after expiration of a message to wait for its transaction
+
+    def __init__(self, wallet: Wallet, poll_interval: float = 1  # seconds between checks of wallet transactions
+                 ):
+        if isinstance(wallet, HighloadWallet):
+            raise WalletError('highload wallet has no seqno, its transfer_batch can be called without waiting')
+        if not wallet.has_access():
+            raise WalletError('Cannot send from wallet without wallet mnemonics\nCreate wallet like Wallet(mnemonics=["your", "mnemonic", "here"...], version="your_wallet_version")')
+        self.wallet = wallet
+        self.poll_interval = poll_interval
+        self.seqno = None  # seqno of the next message, None - requested before sending it
+        self._last_lt = None  # last checked wallet transaction
+        self._queue = collections.deque()  # (transfer, future)
+        self._worker = None
+
+    def send(self, transfer) -> asyncio.Future:
+        """
+        queues TonTransfer, JettonTransfer or NftTransfer, returns future resolved with wallet Transaction
+        that processed its message or failed with the error of sending (WalletError if the message wasn't processed)
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((transfer, future))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._run())
+        return future
+
+    async def close(self):
+        """
+        waits until all queued transfers are processed
+        """
+        while self._worker is not None and not self._worker.done():
+            await self._worker
+
+    async def _run(self):
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.wallet.max_messages))]
+            try:
+                transaction = await self._send([transfer for transfer, _ in batch])
+            except asyncio.CancelledError:
+                for _, future in batch + list(self._queue):
+                    future.cancel()
+                self._queue.clear()
+                raise
+            except BaseException as e:  # provider errors are BaseException
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(transaction)
+
+    async def _new_transactions(self) -> list:
+        transactions = [tr async for tr in self.wallet.iter_transactions(since_lt=self._last_lt)]
+        if transactions:
+            self._last_lt = max(int(tr.lt) for tr in transactions)
+        return transactions
+
+    async def _send(self, transfers: list):
+        orders = await asyncio.gather(*[transfer.create_order(self.wallet) for transfer in transfers])
+        if self._last_lt is None:
+            self._last_lt = await _last_transaction_lt(self.wallet)
+        if self.seqno is None:
+            self.seqno = await self.wallet.get_seqno()
+        seqno = self.seqno
+        body = self.wallet._sign(self.wallet._create_signing_message(orders, seqno))
+        message = self.wallet._create_external_message(body, self.wallet._wallet.create_state_init()['state_init'] if seqno == 0 else None)
+        deadline = time.time() + self.message_timeout + self.confirm_delay
+        try:
+            response = await self.wallet.provider.send_boc(bytes_to_b64str(message.to_boc(False)))
+        except BaseException:
+            self.seqno = None  # e.g. seqno was changed by another sender
+            raise
+        if _is_rejected(response):
+            self.seqno = None
+            raise WalletError(f'message with seqno {seqno} was rejected with status {response}')
+        body_hash = body.bytes_hash()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            transactions = await self._new_transactions()
+            transaction = self._find(transactions, body_hash)
+            if transaction is None and any(not tr.in_msg.source for tr in transactions):
+                # external message of another sender, check if it took our seqno
+                current = await self.wallet.get_seqno()
+                if current > seqno:
+                    transaction = self._find(await self._new_transactions(), body_hash)  # ours could be processed after the check
+                    if transaction is None:
+                        self.seqno = current
+                        raise WalletError(f'seqno {seqno} was used by another message')
+            if transaction is not None:
+                self.seqno = seqno + 1
+                return transaction
+            if time.time() > deadline:
+                self.seqno = None
+                raise WalletError(f'message with seqno {seqno} was not processed before expiration')
+
+    @staticmethod
+    def _find(transactions: list, body_hash: bytes):
+        for tr in transactions:
+            cell = tr.in_msg.cell if not tr.in_msg.source else None
+            if cell is not None and cell.bytes_hash() == body_hash:
+                return tr
+        return None
@@ -0,0 +1,103 @@
+import time
+
+from tonsdk.boc import Cell
+from tonsdk.utils import b64str_to_bytes
+
+from .utils import get_nft_item_addresses, get_jetton_wallet_addresses, jetton_wallet_layouts
+from ..Providers.address import address_key, raw_address
+
+
+class LocalGetMethodError(BaseException):
+    pass
+
+
+class LocalState:
+    """
+    Code and data of a contract for local get methods. Cells are parsed again only if last transaction lt has changed.
+    verified: method: variant of local implementation that gave the same result as remote get method or False
+    """
+
+    def __init__(self, address: str):
+        self.address = address
+        self.code = None
+        self.data = None
+        self.last_transaction_lt = None
+        self.updated_at = 0
+        self.verified = {}
+        self._raw_code = None
+
+    def is_stale(self, ttl: float):
+        return time.monotonic() - self.updated_at > ttl
+
+    async def refresh(self, provider):
+        state = await provider.get_code_and_data(self.address)
+        lt = state.get('last_transaction_lt')  # not every provider returns it
+        if self.data is None or lt is None or lt != self.last_transaction_lt:
+            if state['code'] != self._raw_code:
+                self.verified = {}  # code was changed, local implementations should be checked again
+            self.code = Cell.one_from_boc(b64str_to_bytes(state['code'])) if state['code'] else None
+            self.data = Cell.one_from_boc(b64str_to_bytes(state['data'])) if state['data'] else None
+            self.last_transaction_lt = lt
+            self._raw_code = state['code']
+        self.updated_at = time.monotonic()
+
+
+def _nft_address_by_index(state: LocalState, stack: list, variant: str):
+    # standard collection: data refs are content and nft_item_code
+    return [get_nft_item_addresses(state.data.refs[1], state.address, [int(stack[0])], address_key(state.address)[0])[0]]
+
+
+def _jetton_wallet_address(state: LocalState, stack: list, variant: str):
+    # standard minter: data refs are content and jetton_wallet_code
+    return [get_jetton_wallet_addresses(state.data.refs[1], state.address, [stack[0]], variant, address_key(state.address)[0])[0]]
+
+
+async def _remote_nft_address_by_index(provider, address: str, stack: list):
+    return [await provider.get_nft_address_by_index(address, int(stack[0]))]
+
+
+async def _remote_jetton_wallet_address(provider, address: str, stack: list):
+    return [await provider.get_jetton_wallet_address(address, stack[0])]
+
+
+# method: (variants, local implementation, remote implementation)
+# seqno isn't here: a value up to local_state_ttl old is unsafe for building wallet messages
+local_get_methods = {
+    'get_nft_address_by_index': (('standard', ), _nft_address_by_index, _remote_nft_address_by_index),
+    'get_wallet_address': (jetton_wallet_layouts, _jetton_wallet_address, _remote_jetton_wallet_address),
+}
+
+
+def _normalize(values: list):
+    return [raw_address(value) if isinstance(value, str) else value for value in values]
+
+
+async def run_local_get_method(contract, method: str, stack: list, ttl: float):
+    """
+    Runs get method on code and data fetched not earlier than ttl seconds ago. stack and result are lists of python values
+    (ints and addresses). First call of every method also runs it remotely and remembers the variant of local implementation
+    that gave the same result, if there is no such variant the method is always run remotely for this contract.
+    """
+    if method not in local_get_methods:
+        raise LocalGetMethodError(f'get method {method} can\'t be run locally, supported methods: {", ".join(local_get_methods)}')
+    if contract.local_state is None:
+        contract.local_state = LocalState(contract.address)
+    state = contract.local_state
+    if state.is_stale(ttl):
+        await state.refresh(contract.provider)
+    variants, local, remote = local_get_methods[method]
+    variant = state.verified.get(method)
+    if variant is None:
+        result = await remote(contract.provider, contract.address, stack)
+        state.verified[method] = False
+        for variant in variants:
+            try:
+                if _normalize(local(state, stack, variant)) == _normalize(result):
+                    state.verified[method] = variant
+                    break
+            except Exception:  # contract data has another layout
+                continue
+        return result
+    if variant is False:
+        return await remote(contract.provider, contract.address, stack)
+    return [contract.provider._process_address(value) if isinstance(value, str) else value for value in local(state, stack, variant)]
@@ -1,6 +1,10 @@
+import typing
+from hashlib import sha256
+
 from tvm_valuetypes import deserialize_boc
 from pytonlib.utils.tlb import Transaction as PytonlibTransaction, Slice as PytonlibSlice
-from tonsdk.utils import b64str_to_bytes
+from tonsdk.boc import Cell
+from tonsdk.utils import Address, b64str_to_bytes
 
 
 def transaction_status(tr_data: str):
@@ -26,6 +30,87 @@ def is_hex(string: str):
     return True
 
 
+def cell_hash(bits: int, bits_length: int, refs: typing.Sequence[typing.Tuple[bytes, int]] = ()):
+    """
+    (hash, depth) of ordinary cell with data bits given as int and refs given as (hash, depth) pairs
+    """
+    length = (bits_length + 7) // 8
+    if bits_length % 8:
+        bits = ((bits << 1) | 1) << (length * 8 - bits_length - 1)  # top up
+    cell_repr = bytes([len(refs), length + bits_length // 8]) + bits.to_bytes(length, 'big')
+    depth = 0
+    for ref_hash, ref_depth in refs:
+        cell_repr += ref_depth.to_bytes(2, 'big')
+        depth = max(depth, ref_depth + 1)
+    for ref_hash, ref_depth in refs:
+        cell_repr += ref_hash
+    return sha256(cell_repr).digest(), depth
+
+
+def code_hash(code: typing.Union[Cell, bytes, str]):
+    """
+    (hash, depth) of contract code, code may be library cell
+    """
+    if isinstance(code, str):
+        code = b64str_to_bytes(code)
+    if isinstance(code, (bytes, bytearray)):
+        code = Cell.one_from_boc(code)
+    if code.is_exotic and code.bits.cursor == 264 and not code.refs:
+        # library cell: type 0x02 and library hash, tonsdk can't hash exotic cells
+        return sha256(b'\x08\x42' + bytes(code.bits.get_top_upped_array())).digest(), 0
+    return code.bytes_hash(), code.get_max_depth()
+
+
+def address_bits(address: Address):
+    """
+    address as int of 267 bits of MsgAddressInt (addr_std$10 anycast:0 workchain_id:int8 address:bits256)
+    """
+    return (0b100 << 264) | ((address.wc & 0xff) << 256) | int.from_bytes(address.hash_part, 'big')
+
+
+def state_init_address(code: typing.Tuple[bytes, int], data: typing.Tuple[bytes, int], wc: int = 0):
+    """
+    raw address of contract with StateInit(code, data), code and data are given as (hash, depth)
+    """
+    state_init_hash, _ = cell_hash(0b00110, 5, (code, data))  # split_depth, special and library are absent
+    return f'{wc}:{state_init_hash.hex()}'
+
+
+def get_nft_item_addresses(item_code: typing.Union[Cell, bytes, str], collection_address: str, indexes: typing.Iterable[int], wc: int = 0):
+    """
+    raw addresses of standard nft items (item data is index:uint64 collection_address:MsgAddressInt).
+    item_code may be boc bytes or base64 string, so the function can be used in a process pool
+    """
+    code = code_hash(item_code)
+    collection_part = address_bits(Address(collection_address))
+    return [state_init_address(code, cell_hash((index << 267) | collection_part, 331), wc) for index in indexes]
+
+
+jetton_wallet_layouts = ('standard', 'status')
+
+
+def get_jetton_wallet_addresses(wallet_code: typing.Union[Cell, bytes, str], jetton_master_address: str, owners: typing.Iterable[str], layout: str = 'standard', wc: int = 0):
+    """
+    raw addresses of jetton wallets with empty balance in initial data
+    layouts: 'standard' - balance:Coins owner:MsgAddressInt jetton_master:MsgAddressInt wallet_code:^Cell
+             'status' - status:uint4 balance:Coins owner:MsgAddressInt jetton_master:MsgAddressInt (e.g. governed jettons)
+    """
+    code = code_hash(wallet_code)
+    master_part = address_bits(Address(jetton_master_address))
+    result = []
+    for owner in owners:
+        # zero balance is 4 zero bits of Coins length
+        owner_master_part = (address_bits(Address(owner)) << 267) | master_part
+        if layout == 'standard':
+            data = cell_hash(owner_master_part, 538, (code, ))
+        elif layout == 'status':
+            data = cell_hash(owner_master_part, 542)
+        else:
+            raise ValueError(f'unknown jetton wallet layout {layout}')
+        result.append(state_init_address(code, data, wc))
+    return result
+
+
 known_prefixes = {
     '00000000': 'TextCommentMessage',
     '5fcc3d14': 'NftTransferMessage',
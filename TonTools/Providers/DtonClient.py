@@ -1,19 +1,29 @@
 import asyncio
+import itertools
+import json
 import typing
+from collections import OrderedDict
 from datetime import datetime
 from math import ceil
 import base64
 import aiohttp
 import requests
-from graphql_query import Argument, Field, Operation, Query
+from graphql_query import Argument, Field, Operation, Query, Variable
 
 from tonsdk.boc import Cell
-from tonsdk.utils import Address, b64str_to_bytes, bytes_to_b64str
+from tonsdk.utils import b64str_to_bytes, bytes_to_b64str
 
-from .utils import get, markets_adresses, is_hex
+from .utils import markets_adresses, is_hex, iter_bounded
 from ..Contracts.NFT import NftItem, NftCollection
 from ..Contracts.Contract import Transaction
 from ..Contracts.Jetton import Jetton, JettonWallet
+from .session import ConnectionPool, PooledClient
+from .metadata import MetadataCache
+from .ipfs import IpfsGateways
+from .rate_limit import RateLimiter
+from .cache import RequestCoalescer
+from .stack import DtonStack, unique_calls, collect_results
+from .address import address_key, format_address, raw_address
 
 
 class DtonError(BaseException):
@@ -31,14 +41,31 @@ async def process_response(response: aiohttp.ClientResponse):
         return response_dict
 
 
-class DtonClient:
+class DtonClient(PooledClient):
+    rendered_queries_maxsize = 1000  # rendered documents kept by _render_document
+    # argument name: graphql type of arguments sent as variables, other arguments are rendered inline, so the server
+    # coerces literals of enums and custom scalars. add arguments of your queries, e.g. client.argument_types['lt'] = 'BigInt!'
+    argument_types = {'address': 'String!', 'address_friendly': 'String!', 'workchain': 'Int!',
+                      'page': 'Int!', 'page_size': 'Int!', 'method_name': 'String!'}
+
     def __init__(self,
                  key: str = None,  # dton api key
                  addresses_form='user_friendly',  # addresses_form could be 'raw' or 'user_friendly'
                  testnet=False,
-                 private_graphql=False
+                 private_graphql=False,
+                 pool: ConnectionPool = None,  # pass one ConnectionPool to several clients to share connections
+                 rate_limiter: RateLimiter = None,  # pass one RateLimiter to several clients to share limits
+                 metadata_cache: MetadataCache = None,  # in memory cache by default, False - don't cache offchain metadata
+                 ipfs_gateways: IpfsGateways = None,  # gateways for ipfs metadata, IpfsGateways() by default
+                 login: bool = True  # False - don't log in with blocking request, call await client.login() instead
                  ):
+        self._set_pool(pool)
+        self._set_rate_limiter(rate_limiter, key)
+        self._set_metadata_cache(metadata_cache)
+        self._set_ipfs_gateways(ipfs_gateways)
         self.form = addresses_form
+        self._rendered_queries = OrderedDict()  # (type, roots shapes): rendered document
+        self.argument_types = dict(self.argument_types)
         if testnet:
             self.testnet = True
             self.base_url = 'https://testnet.dton.io/'
@@ -49,39 +76,59 @@ class DtonClient:
             self.base_url += 'graphql_private/'
         else:
             self.base_url += 'graphql/'
-        if key:
+        self.key = key
+        self.cookies = {}
+        if key and login:
             response = requests.get(url=self.base_url + f'login?token={key}')
             if not response.json()['success']:
                 raise DtonError('invalid api token')
             self.cookies = response.cookies.get_dict()  # get cookies for login
-        else:
-            self.cookies = {}
+
+    @classmethod
+    async def create(cls, *args, **kwargs):
+        """
+        same as DtonClient(...), but logs in without blocking the event loop
+        """
+        client = cls(*args, login=False, **kwargs)
+        await client.login()
+        return client
+
+    async def login(self):
+        if not self.key:
+            return
+        async with self.limit():
+            async with self.session.get(url=self.base_url + 'login', params={'token': self.key}) as response:
+                data = await response.json(content_type=None)
+                cookies = {name: morsel.value for name, morsel in response.cookies.items()}
+        if not data.get('success'):
+            raise DtonError('invalid api token')
+        self.cookies = cookies  # get cookies for login
 
     def _process_address(self, address):
-        if self.form == 'raw':
-            return Address(address).to_string(is_user_friendly=False)
-        elif self.form == 'user_friendly':
-            if self.testnet:
-                return Address(address).to_string(True, True, True, True)
-            else:
-                return Address(address).to_string(True, True, True)
+        return format_address(address, self.form, self.testnet)
 
     @staticmethod
     def get_friendly(address: str):
-        return Address(address).to_string(True, True, True)
+        return format_address(address)
+
+    @staticmethod
+    def get_wc_hex(address: str):
+        """
+        (workchain, upper case hex of hash part) as used in dton queries
+        """
+        wc, hash_part = address_key(address)
+        return wc, hash_part.hex().upper()
 
     def get_addr_from_wc_hex(self, wc: int, hex: str):
-        return self._process_address(
-            Address(str(wc) + ':' + hex).to_string()
-        )
+        return self._process_address(f'{wc}:{hex}')
 
     async def send_query(self, graphql_query: str, variables=None):
         if variables is None:
             variables = {}
-        async with aiohttp.ClientSession(cookies=self.cookies) as session:
-            response = await session.post(url=self.base_url, json={'query': graphql_query, 'variables': variables})
+        async with self.limit():
+            response = await self.session.post(url=self.base_url, json={'query': graphql_query, 'variables': variables}, cookies=self.cookies)
             response = await process_response(response)
-            return response['data']
+        return response['data']
 
     """
     low level part
@@ -105,39 +152,85 @@ class DtonClient:
         return result
 
     def process_args(self, args: dict):
-        result = []
-        for k, v in args.items():
-            if isinstance(v, str):
-                v = f'"{v}"'
-            if isinstance(v, bool):
-                v = 'true' if v else 'false'
-            if isinstance(v, list):
-                temp = []
-                for i in v:
-                    temp.append(self.process_args(i))
-                v = temp
-            if isinstance(v, dict):
-                v = self.process_args(v)
-            result.append(Argument(name=k, value=v))
-        return result
-
-    async def raw_send_query(self, table_name: str, fields: list, type="query", **kwargs):
-        result_args = self.process_args(kwargs)
-        result_fields = self.process_fields(fields)
-
-        sub_query = Query(
-            name=table_name,
-            arguments=result_args,
-            fields=result_fields
-        )
+        # arguments rendered inline as graphql literals
+        return self._process_shape(args, '', [])
+
+    def _parameterize(self, value, name: str, variables: dict, argument: str = None):
+        """
+        shape of query arguments: values of argument_types are moved to variables (by path name, e.g. q0_account_address_friendly)
+        and replaced with ['$', graphql type], so queries that differ only in these values share one rendered document
+        """
+        if isinstance(value, dict):
+            return {k: self._parameterize(v, f'{name}_{k}', variables, k) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._parameterize(v, f'{name}_{i}', variables) for i, v in enumerate(value)]
+        graphql_type = self.argument_types.get(argument)
+        if graphql_type is None or value is None:
+            return value
+        if graphql_type.startswith('Int') and not (isinstance(value, int) and -2 ** 31 <= value < 2 ** 31):
+            return value  # out of Int range
+        variables[name] = value
+        return ['$', graphql_type]
+
+    def _process_shape(self, shape, name: str, variables: list):
+        if isinstance(shape, dict):
+            return [Argument(name=k, value=self._process_shape(v, f'{name}_{k}', variables)) for k, v in shape.items()]
+        if isinstance(shape, list) and len(shape) == 2 and shape[0] == '$':
+            variable = Variable(name=name, type=shape[1])
+            variables.append(variable)
+            return variable
+        if isinstance(shape, list):
+            return [self._process_shape(v, f'{name}_{i}', variables) for i, v in enumerate(shape)]
+        # inline literal
+        if shape is None:
+            return 'null'
+        if isinstance(shape, bool):
+            return 'true' if shape else 'false'
+        if isinstance(shape, str):
+            return json.dumps(shape)
+        return shape
+
+    def _render_document(self, type: str, roots: list) -> str:
+        """
+        roots: [(table_name, fields, arguments shape), ...], root i gets alias qi
+        """
+        key = (type, tuple((table_name, json.dumps(fields), json.dumps(shape)) for table_name, fields, shape in roots))
+        rendered = self._rendered_queries.get(key)
+        if rendered is None:
+            variables = []
+            queries = [
+                Query(
+                    name=table_name,
+                    alias=f'q{i}',
+                    arguments=self._process_shape(shape, f'q{i}', variables),
+                    fields=self.process_fields(fields)
+                )
+                for i, (table_name, fields, shape) in enumerate(roots)
+            ]
+            rendered = Operation(type=type, variables=variables, queries=queries).render()
+            self._rendered_queries[key] = rendered
+            if len(self._rendered_queries) > self.rendered_queries_maxsize:
+                self._rendered_queries.popitem(last=False)
+        else:
+            self._rendered_queries.move_to_end(key)
+        return rendered
+
+    async def raw_send_queries(self, queries: list, type="query", batch_size: int = 100) -> list:
+        """
+        queries: [(table_name, fields, kwargs), ...], up to batch_size queries are sent as one graphql document
+        with aliased roots. argument values are sent as variables. returns results in the same order, None for a failed query
+        """
+        async def send_batch(batch: list):
+            variables = {}
+            roots = [(table_name, fields, self._parameterize(kwargs, f'q{i}', variables)) for i, (table_name, fields, kwargs) in enumerate(batch)]
+            data = await self.send_query(self._render_document(type, roots), variables) or {}
+            return [data.get(f'q{i}') for i in range(len(batch))]
 
-        query = Operation(
-            type=type,
-            queries=[sub_query]
-        ).render()
+        batches = [queries[i:i + batch_size] for i in range(0, len(queries), batch_size)]
+        return sum(await asyncio.gather(*[send_batch(batch) for batch in batches]), [])
 
-        result = await self.send_query(query)
-        return result[table_name]
+    async def raw_send_query(self, table_name: str, fields: list, type="query", **kwargs):
+        return (await self.raw_send_queries([(table_name, fields, kwargs)], type))[0]
 
     async def page_generator(self, table_name: str, fields: list, **kwargs):
         kwargs['page'] = 0
@@ -145,29 +238,42 @@ class DtonClient:
             yield self.raw_send_query(table_name, fields, **kwargs)
             kwargs['page'] += 1
 
-    async def query_with_pagination(self, table_name: str, fields: list, **kwargs):
-        if 'limit' not in kwargs:
-            kwargs['limit'] = -1
+    async def iter_query(self, table_name: str, fields: list, pages_in_flight: int = 4, **kwargs):
+        """
+        yields rows of table_name, pages_in_flight pages are requested concurrently.
+        stops after the first short page or after limit rows (limit=-1 - all rows), if page is specified only this page is requested
+        """
+        limit = kwargs.pop('limit', -1)
         if 'page_size' not in kwargs:
             kwargs['page_size'] = 150
-        limit = kwargs.pop('limit')
-        if 'page' not in kwargs:
-            result = []
-            async for i in self.page_generator(table_name, fields, **kwargs):
-                resp = await i
-                if isinstance(resp, dict) and 'data' in resp:
-                    resp = resp['data']
-                result += resp
-                if len(result) >= limit != -1:
-                    return result[:limit]
-                if len(resp) < kwargs['page_size']:
-                    return result
+        if 'page' in kwargs:
+            page_numbers = [kwargs.pop('page')]
         else:
-            result = await self.raw_send_query(table_name, fields, **kwargs)
-            if limit == -1:
-                return result
-            else:
-                return result[:limit]
+            page_numbers = itertools.count()
+            if limit != -1:
+                pages_in_flight = max(1, min(pages_in_flight, ceil(limit / kwargs['page_size'])))
+
+        async def fetch_page(page: int):
+            return await self.raw_send_query(table_name, fields, page=page, **kwargs)
+
+        pages = iter_bounded(fetch_page, page_numbers, pages_in_flight)
+        count = 0
+        try:
+            async for _, rows in pages:
+                if isinstance(rows, dict) and 'data' in rows:
+                    rows = rows['data']
+                for row in rows:
+                    if count == limit:
+                        return
+                    yield row
+                    count += 1
+                if len(rows) < kwargs['page_size']:
+                    return
+        finally:
+            await pages.aclose()  # cancels pages requested after the last one
+
+    async def query_with_pagination(self, table_name: str, fields: list, pages_in_flight: int = 4, **kwargs):
+        return [row async for row in self.iter_query(table_name, fields, pages_in_flight, **kwargs)]
 
     async def raw_get_transactions(self, fields: list, **kwargs):
         if 'address' in kwargs and not is_hex(kwargs['address']):
@@ -179,7 +285,7 @@ class DtonClient:
     async def raw_get_account_states(self, fields: list, **kwargs):
         if 'address' in kwargs and not is_hex(kwargs['address']):
             # you can specify address kwarg both in hashpart-hex and user-friendly form
-            hashpart, wc = Address(kwargs['address']).hash_part.hex().upper(), Address(kwargs['address']).wc
+            wc, hashpart = self.get_wc_hex(kwargs['address'])
             kwargs['address'] = hashpart
             kwargs['workchain'] = wc
         if 'order_by' not in kwargs:
@@ -213,20 +319,82 @@ class DtonClient:
 
         return data['stack']
 
+    async def run_get_method_stack(self, address: str, method: str, stack: list) -> DtonStack:
+        """
+        same as run_get_method, but returns lazily decoded stack: data.int(0), data.cell(1), data.address(2)
+        """
+        return DtonStack(await self.run_get_method(address, method, stack))
+
+    async def run_get_methods(self, calls: list, return_exceptions: bool = False, batch_size: int = 50) -> list:
+        """
+        runs [(address, method, stack), ...] as aliased run_method mutations, batch_size calls in one graphql document,
+        returns DtonStack for every call in the same order. identical calls are sent once.
+        if return_exceptions is True failed calls are returned as exceptions instead of raising the first one
+        """
+        unique, indexes = unique_calls(calls, RequestCoalescer.get_method_key)
+        chunks = [unique[i:i + batch_size] for i in range(0, len(unique), batch_size)]
+        results = sum(await asyncio.gather(*[self._run_get_methods_batch(chunk) for chunk in chunks]), [])
+        return collect_results(results, indexes, return_exceptions)
+
+    async def _run_get_methods_batch(self, calls: list):
+        fields = ['exit_code', 'gas_used', 'vm_steps', 'success', {'stack': ['value_type', 'value']}]
+        data = await self.raw_send_queries([
+            ('run_method', fields, {'account_search_by_address': {'address_friendly': self.get_friendly(address)},
+                                    'method_name': method, 'stack': stack})
+            for address, method, stack in calls
+        ], 'mutation', len(calls))
+        results = []
+        for result, (address, method, stack) in zip(data, calls):
+            if result is None:
+                results.append(DtonError(f'dton failed to run get method {method} for address {self._process_address(address)}'))
+            elif not result['success']:
+                results.append(DtonError(
+                    f'get method {method} for address {self._process_address(address)} exit code is {result["exit_code"]}'))
+            else:
+                results.append(DtonStack(result['stack']))
+        return results
+
+    _nft_item_fields = ["parsed_nft_index",
+                        'parsed_nft_collection_address_workchain',
+                        'parsed_nft_collection_address_address',
+                        'parsed_nft_owner_address_workchain',
+                        'parsed_nft_owner_address_address',
+                        'parsed_owner_is_seller',
+                        'parsed_nft_content_offchain_url']
+
+    _nft_sale_fields = ["parsed_seller_nft_prev_owner_address_workchain",
+                        "parsed_seller_nft_prev_owner_address_address",
+                        "parsed_seller_market_address_workchain",
+                        "parsed_seller_market_address_address",
+                        "parsed_seller_nft_price",
+                        "parsed_seller_min_bid"]
+
+    def _first_row(self, rows: list, address: str):
+        if not rows:
+            raise DtonError(f'dton returned no data for address {self._process_address(address)}')
+        return rows[0]
+
+    def _last_state_query(self, fields: list, address: str):
+        # last transaction of the account with parsed data, same as raw_get_transactions(..., limit=1)
+        return 'transactions', fields, {'account': {'address_friendly': self.get_friendly(address)}, 'page_size': 1, 'page': 0}
+
     async def get_nft_items(self, nft_addresses: list):
-        # in future will be replaced for searchNFTs
-        return await asyncio.gather(*[self.get_nft_item(nft_address) for nft_address in nft_addresses])
+        # items and then sales of items on sale are requested in aliased batches
+        items = await self.raw_send_queries([self._last_state_query(self._nft_item_fields, address) for address in nft_addresses])
+        items = [self._first_row(data, address) for data, address in zip(items, nft_addresses)]
+        on_sale = [i for i, data in enumerate(items) if data['parsed_owner_is_seller']]
+        owners = {i: self.get_addr_from_wc_hex(items[i]['parsed_nft_owner_address_workchain'], items[i]['parsed_nft_owner_address_address'])
+                  for i in on_sale}
+        sales = await self.raw_send_queries([self._last_state_query(self._nft_sale_fields, owners[i]) for i in on_sale])
+        sales = {i: self._first_row(data, owners[i]) for i, data in zip(on_sale, sales)}
+        return await asyncio.gather(*[
+            self._process_nft_item(address, data, sales.get(i)) for i, (address, data) in enumerate(zip(nft_addresses, items))
+        ])
 
     async def get_nft_item(self, nft_address: str):
-        data = (await self.raw_get_transactions(["parsed_nft_index",
-                                                 'parsed_nft_collection_address_workchain',
-                                                 'parsed_nft_collection_address_address',
-                                                 'parsed_nft_owner_address_workchain',
-                                                 'parsed_nft_owner_address_address',
-                                                 'parsed_owner_is_seller',
-                                                 'parsed_nft_content_offchain_url'],
-                                                account={'address_friendly': self.get_friendly(nft_address)}, limit=1))[0]
+        return (await self.get_nft_items([nft_address]))[0]
 
+    async def _process_nft_item(self, nft_address: str, data: dict, sale_data: dict = None):
         col_addr = self.get_addr_from_wc_hex(data['parsed_nft_collection_address_workchain'], data['parsed_nft_collection_address_address'])
         result = {
             'address': self._process_address(nft_address),
@@ -236,28 +404,23 @@ class DtonClient:
             'collection': {
                 'address': col_addr
             },
-            'metadata': await get(data['parsed_nft_content_offchain_url']) if data['parsed_nft_content_offchain_url'] else {}
+            'metadata': await self.get_metadata(data['parsed_nft_content_offchain_url']) if data['parsed_nft_content_offchain_url'] else {}
         }
 
         if data['parsed_owner_is_seller']:
-            sale = await self._get_nft_sale(result['owner'])
-            result['sale'] = sale
+            result['sale'] = self._process_nft_sale(result['owner'], sale_data)
 
         return NftItem(result, provider=self)
 
     async def _get_nft_sale(self, owner_address: str):
-
-        data = (await self.raw_get_transactions(["parsed_seller_nft_prev_owner_address_workchain",
-                                                 "parsed_seller_nft_prev_owner_address_address",
-                                                 "parsed_seller_market_address_workchain",
-                                                 "parsed_seller_market_address_address",
-                                                 "parsed_seller_nft_price",
-                                                 "parsed_seller_min_bid"],
+        data = (await self.raw_get_transactions(self._nft_sale_fields,
                                                 account={'address_friendly': self.get_friendly(owner_address)}, limit=1))[0]
+        return self._process_nft_sale(owner_address, data)
 
+    def _process_nft_sale(self, owner_address: str, data: dict):
         market_address = self.get_addr_from_wc_hex(data['parsed_seller_market_address_workchain'], data['parsed_seller_market_address_address'])
 
-        market_name = markets_adresses.get(Address(market_address).to_string(False), '')
+        market_name = markets_adresses.get(raw_address(market_address), '')
 
         real_owner = self.get_addr_from_wc_hex(data['parsed_seller_nft_prev_owner_address_workchain'], data['parsed_seller_nft_prev_owner_address_address'])
 
@@ -288,7 +451,7 @@ class DtonClient:
                                                  "parsed_collection_owner_address_address"],
                                                 account={'address_friendly': self.get_friendly(collection_address)}, limit=1))[0]
 
-        collection_metadata = await get(data['parsed_collection_content_offchain_url']) if data['parsed_collection_content_offchain_url'] else {}
+        collection_metadata = await self.get_metadata(data['parsed_collection_content_offchain_url']) if data['parsed_collection_content_offchain_url'] else {}
 
         owner_address = self.get_addr_from_wc_hex(data['parsed_collection_owner_address_workchain'], data['parsed_collection_owner_address_address'])
 
@@ -306,8 +469,8 @@ class DtonClient:
             await collection.update()
 
         data = await self.raw_get_account_states(
-            ['address', 'workchain'], parsed_nft_collection_address_workchain=Address(collection.address).wc,
-            parsed_nft_collection_address_address=Address(collection.address).hash_part.hex().upper(),
+            ['address', 'workchain'], parsed_nft_collection_address_workchain=self.get_wc_hex(collection.address)[0],
+            parsed_nft_collection_address_address=self.get_wc_hex(collection.address)[1],
             parsed_nft_true_nft_in_collection=1, order_by="parsed_nft_index"
         )
         result = []
@@ -372,7 +535,7 @@ class DtonClient:
         ))[0]
 
         if data['parsed_jetton_content_offchain_url'] is not None:
-            result = await get(data['parsed_jetton_content_offchain_url'])
+            result = await self.get_metadata(data['parsed_jetton_content_offchain_url'])
         else:
             result = {
                 'name': data['parsed_jetton_content_name_value'],
@@ -394,26 +557,46 @@ class DtonClient:
         data = await self.run_get_method(address=address, method='seqno', stack=[])
         return int(data[0]['value'])
 
+    def _account_state_query(self, fields: list, address: str):
+        # same as raw_get_account_states(fields, address=address)[0]
+        return 'account_states', fields, {'address': self.get_wc_hex(address)[1], 'workchain': self.get_wc_hex(address)[0],
+                                          'order_by': 'gen_utime', 'page_size': 1, 'page': 0}
+
     async def get_balance(self, address: str):
-        data = (await self.raw_get_account_states(['account_storage_balance_grams'],
-                                                 address=Address(address).hash_part.hex().upper(),
-                                                 workchain=Address(address).wc))[0]
+        return (await self.get_balances([address]))[0]
 
-        return int(data['account_storage_balance_grams'])
+    async def get_balances(self, addresses: list):
+        """
+        balances of addresses in the same order, fetched in aliased batches
+        """
+        data = await self.raw_send_queries([self._account_state_query(['account_storage_balance_grams'], address) for address in addresses])
+        return [int(self._first_row(states, address)['account_storage_balance_grams']) for states, address in zip(data, addresses)]
 
     async def get_state(self, address: str):
-        data = (await self.raw_get_account_states(['account_state_type'],
-                                                  address=Address(address).hash_part.hex().upper(),
-                                                  workchain=Address(address).wc))[0]
+        return (await self.get_states([address]))[0]
+
+    async def get_states(self, addresses: list):
+        """
+        states of addresses in the same order, fetched in aliased batches
+        """
+        data = await self.raw_send_queries([self._account_state_query(['account_state_type'], address) for address in addresses])
+        return [self._first_row(states, address)['account_state_type'] for states, address in zip(data, addresses)]
 
-        return data['account_state_type']
+    async def get_code_and_data(self, address: str):
+        fields = ['account_state_state_init_code', 'account_state_state_init_data']
+        data = self._first_row((await self.raw_send_queries([self._account_state_query(fields, address)]))[0], address)
+
+        return {
+            'code': data['account_state_state_init_code'],
+            'data': data['account_state_state_init_data']
+        }
 
     async def get_all_jetton_wallets_by_owner(self, owner_address: str):
         data = await self.raw_get_account_states(
             fields=['workchain', 'address', 'parsed_jetton_wallet_balance',
                     'parsed_jetton_wallet_jetton_address_workchain', 'parsed_jetton_wallet_jetton_address_address'],
-            parsed_jetton_wallet_owner_address_address=Address(owner_address).hash_part.hex().upper(),
-            parsed_jetton_wallet_owner_address_workchain=Address(owner_address).wc
+            parsed_jetton_wallet_owner_address_address=self.get_wc_hex(owner_address)[1],
+            parsed_jetton_wallet_owner_address_workchain=self.get_wc_hex(owner_address)[0]
         )
         result = []
         for wallet in data:
@@ -435,8 +618,8 @@ class DtonClient:
                             'parsed_jetton_wallet_balance', 'parsed_jetton_wallet_owner_address_workchain',
                             'parsed_jetton_wallet_owner_address_address', 'parsed_jetton_wallet_jetton_address_workchain',
                             'parsed_jetton_wallet_jetton_address_address', 'account_state_state_init_code'],
-                            address=Address(jetton_wallet_address).hash_part.hex().upper(),
-                            workchain=Address(jetton_wallet_address).wc))[0]
+                            address=self.get_wc_hex(jetton_wallet_address)[1],
+                            workchain=self.get_wc_hex(jetton_wallet_address)[0]))[0]
 
         wallet = {
             'address': self._process_address(jetton_wallet_address),
@@ -1,10 +1,7 @@
 import asyncio
-from math import ceil
 
 import aiohttp
-import base64
 from tonsdk.boc import Cell
-from ton.utils.cell import read_address
 from tonsdk.utils import Address, bytes_to_b64str, b64str_to_bytes
 from ton import TonlibClient
 
@@ -12,7 +9,15 @@ from ..Contracts.NFT import NftItem, NftCollection
 from ..Contracts.Contract import Transaction
 from ..Contracts.Wallet import Wallet
 from ..Contracts.Jetton import Jetton, JettonWallet
-from .utils import markets_adresses, get, process_jetton_data
+from .utils import markets_adresses, process_jetton_data, iter_bounded, iter_pages
+from .session import ConnectionPool, PooledClient
+from .metadata import MetadataCache
+from .ipfs import IpfsGateways
+from .cache import RequestCoalescer, AccountCache
+from .stack import TonlibStack, unique_calls, collect_results
+from .columnar import iter_transaction_batches
+from .ls_pool import LiteServerPool, init_clients
+from .address import format_address, raw_address
 
 
 class LsClientError(BaseException):
@@ -34,7 +39,7 @@ async def process_response(response: aiohttp.ClientResponse):
         return response_dict
 
 
-class LsClient(TonlibClient):
+class LsClient(TonlibClient, PooledClient):
 
     def __init__(self, ls_index=0,
                  config='https://ton.org/global-config.json',
@@ -42,31 +47,135 @@ class LsClient(TonlibClient):
                  workchain_id=0,
                  verbosity_level=0,
                  default_timeout=10,
-                 addresses_form='user_friendly'  # or raw
+                 addresses_form='user_friendly',  # or raw
+                 pool: ConnectionPool = None,  # used for offchain metadata requests
+                 get_methods_cache_ttl: float = 0,  # seconds to reuse get methods results, identical running get methods are always sent once
+                 metadata_cache: MetadataCache = None,  # in memory cache by default, False - don't cache offchain metadata
+                 ipfs_gateways: IpfsGateways = None,  # gateways for ipfs metadata, IpfsGateways() by default
+                 ls_indexes: list = None,  # additional liteservers from config, e.g. [1, 2, 3] or 'all', requests are spread between them
+                 max_in_flight_per_ls: int = 50,  # requests running on one liteserver at once
+                 account_cache: bool = False,  # reuse loaded accounts (state and smc) while masterchain seqno is the same
+                 seqno_check_interval: float = 1  # seconds between masterchain seqno checks if account_cache is enabled
                  ):
         super().__init__(ls_index, config, keystore, workchain_id, verbosity_level, default_timeout)
+        self.ls_indexes = ls_indexes
+        self.ls_pool = LiteServerPool([self], max_in_flight_per_ls)
+        self.account_cache = account_cache
+        self.seqno_check_interval = seqno_check_interval
+        self.account_caches = {}  # tonlib client: AccountCache
+        self._set_pool(pool)
+        self._set_metadata_cache(metadata_cache)
+        self._set_ipfs_gateways(ipfs_gateways)
+        self.get_methods_coalescer = RequestCoalescer(get_methods_cache_ttl)
         TonlibClient.enable_unaudited_binaries()
         self.form = addresses_form
 
+    async def init_tonlib(self, cdll_path=None):
+        await super().init_tonlib(cdll_path)
+        if self.ls_indexes is None or len(self.ls_pool.clients) > 1:  # tonlib reconnect calls init_tonlib too
+            return
+        indexes = range(len(self.config['liteservers'])) if self.ls_indexes == 'all' else self.ls_indexes
+        clients = await init_clients(self.config, [i for i in indexes if i != self.ls_index], self.keystore, cdll_path,
+                                     workchain_id=self.workchain_id, verbosity_level=self.verbosity_level, default_timeout=self.default_timeout)
+        self.ls_pool = LiteServerPool([self] + clients, self.ls_pool.max_in_flight)
+
+    async def _get_account(self, client: TonlibClient, address: str):
+        if not self.account_cache:
+            return await client.find_account(address, preload_state=False)
+        if client not in self.account_caches:
+            self.account_caches[client] = AccountCache(self.seqno_check_interval)
+        cache = self.account_caches[client]
+        await cache.sync(lambda: self._get_masterchain_seqno(client))
+        account = cache.get(address)
+        if account is None:
+            account = await client.find_account(address, preload_state=False)
+            cache.set(address, account)
+        return account
+
+    @staticmethod
+    async def _get_masterchain_seqno(client: TonlibClient):
+        return (await client.execute({'@type': 'blocks.getMasterchainInfo'})).last.seqno
+
+    def set_masterchain_seqno(self, seqno: int):
+        """
+        drops cached accounts loaded before masterchain block seqno, e.g. when you get a new block
+        """
+        for cache in self.account_caches.values():
+            cache.set_seqno(seqno)
+
+    def invalidate_accounts(self, address: str = None):
+        """
+        drops all cached accounts or accounts of address
+        """
+        for cache in self.account_caches.values():
+            cache.invalidate(address)
+
     def _process_address(self, address):
-        if self.form == 'user_friendly':
-            return Address(address).to_string(True, True, True)
-        elif self.form == 'raw':
-            return Address(address).to_string(is_user_friendly=False)
+        return format_address(address, self.form)
 
     async def run_get_method(self, method: str, address: str, stack: list):
-        account = await self.find_account(address, preload_state=False)
-        response = await account.run_get_method(method=method, stack=stack)
+        return (await self.run_get_method_stack(method, address, stack)).raw
+
+    async def run_get_method_stack(self, method: str, address: str, stack: list) -> TonlibStack:
+        """
+        same as run_get_method, but returns lazily decoded stack: data.int(0), data.cell(1), data.address(2)
+        """
+        key = self.get_methods_coalescer.get_method_key(address, method, stack)
+        # decoded stack is shared by coalesced requests, so every entry is decoded once
+        return await self.get_methods_coalescer.run(key, self._run_get_method_stack, method, address, stack)
+
+    async def _run_get_method_stack(self, method: str, address: str, stack: list):
+        return TonlibStack(await self._run_get_method(method, address, stack))
+
+    async def _run_get_method(self, method: str, address: str, stack: list):
+        async with self.ls_pool.acquire() as client:
+            account = await self._get_account(client, address)
+            response = await account.run_get_method(method=method, stack=stack)
 
         if response.exit_code != 0:
             raise GetMethodError(f'get method {method} for address {self._process_address(address)} exit code is {response.exit_code}')
         return response.stack
 
+    async def run_get_methods(self, calls: list, return_exceptions: bool = False) -> list:
+        """
+        runs [(address, method, stack), ...] and returns TonlibStack for every call in the same order. identical calls are
+        sent once, calls of one account share its state and smc and are sent to the liteserver without waiting for each other.
+        if return_exceptions is True failed calls are returned as exceptions instead of raising the first one
+        """
+        unique, indexes = unique_calls(calls, self.get_methods_coalescer.get_method_key)
+        accounts = {}  # raw address: indexes of unique calls
+        for i, (address, method, stack) in enumerate(unique):
+            accounts.setdefault(raw_address(address), []).append(i)
+        results = [None] * len(unique)
+
+        async def run_account(account_calls: list):
+            try:
+                async with self.ls_pool.acquire() as client:
+                    account = await self._get_account(client, unique[account_calls[0]][0])
+                    if account.smc_id is None:
+                        await account.load_smc()
+                    responses = await asyncio.gather(*[account.run_get_method(method=unique[i][1], stack=unique[i][2])
+                                                       for i in account_calls], return_exceptions=True)
+            except Exception as e:
+                responses = [e] * len(account_calls)
+            for i, response in zip(account_calls, responses):
+                address, method, stack = unique[i]
+                if isinstance(response, BaseException):
+                    results[i] = response
+                elif response.exit_code != 0:
+                    results[i] = GetMethodError(
+                        f'get method {method} for address {self._process_address(address)} exit code is {response.exit_code}')
+                else:
+                    results[i] = TonlibStack(response.stack)
+
+        await asyncio.gather(*[run_account(account_calls) for account_calls in accounts.values()])
+        return collect_results(results, indexes, return_exceptions)
+
     async def get_nft_owner(self, nft_address: str):
-        sale = await self._get_nft_sale(nft_address)
+        data = await self.run_get_method_stack(method='get_nft_data', address=nft_address, stack=[])
+        sale = await self._get_nft_sale(nft_address, data)
         if not sale:
-            data = await self.run_get_method(method='get_nft_data', address=nft_address, stack=[])
-            owner_address = read_address(Cell.one_from_boc(base64.b64decode(data[3].cell.bytes))).to_string()
+            owner_address = data.address(3).to_string()
         else:
             owner_address = sale['owner']
         return Wallet(self, self._process_address(owner_address))
@@ -75,15 +184,15 @@ class LsClient(TonlibClient):
         return await asyncio.gather(*[self._get_nft_item(nft_address) for nft_address in nft_addresses])
 
     async def _get_nft_item(self, nft_address: str):
-        data = await self.run_get_method(method='get_nft_data', address=nft_address, stack=[])
+        data = await self.run_get_method_stack(method='get_nft_data', address=nft_address, stack=[])
 
         result = {
             'address': self._process_address(nft_address),
-            'index': int(data[1].number.number),
-            'collection_address': self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[2].cell.bytes)))),
-            'owner': self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[3].cell.bytes)))),
+            'index': data.int(1),
+            'collection_address': self._process_address(data.address(2)),
+            'owner': self._process_address(data.address(3)),
             'collection': {
-                'address': self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[2].cell.bytes))))
+                'address': self._process_address(data.address(2))
             }
         }
         request_stack = [{
@@ -97,33 +206,33 @@ class LsClient(TonlibClient):
                 "@type": "tvm.stackEntryCell",
                 "cell": {
                     "@type": "tvm.cell",
-                    "bytes": data[4].cell.bytes
+                    "bytes": data.boc(4)
                 }
             }]
-        content_data = await self.run_get_method(method='get_nft_content', address=result['collection_address'], stack=request_stack)
-        collection_content_url = Cell.one_from_boc(base64.b64decode(content_data[0].cell.bytes)).bits.get_top_upped_array().decode().split('\x01')[-1]
-        nft_content_url = collection_content_url + Cell.one_from_boc(base64.b64decode(content_data[0].cell.bytes)).refs[0].bits.get_top_upped_array().decode()
+        content_data = await self.run_get_method_stack(method='get_nft_content', address=result['collection_address'], stack=request_stack)
+        collection_content_url = content_data.cell(0).bits.get_top_upped_array().decode().split('\x01')[-1]
+        nft_content_url = collection_content_url + content_data.cell(0).refs[0].bits.get_top_upped_array().decode()
 
-        result['metadata'] = await get(nft_content_url)
+        result['metadata'] = await self.get_metadata(nft_content_url)
 
-        sale = await self._get_nft_sale(nft_address)
+        sale = await self._get_nft_sale(nft_address, data)
         if not sale:
             return NftItem(result, provider=self)
         else:
             result['sale'] = sale
             return NftItem(result, provider=self)
 
-    async def _get_nft_sale(self, nft_address: str):
-        data = await self.run_get_method(method='get_nft_data', address=nft_address, stack=[])
-        owner_address = self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[3].cell.bytes))).to_string())
+    async def _get_nft_sale(self, nft_address: str, nft_data: TonlibStack = None):
+        data = nft_data or await self.run_get_method_stack(method='get_nft_data', address=nft_address, stack=[])
+        owner_address = self._process_address(data.address(3).to_string())
         try:
-            data = await self.run_get_method(method='get_sale_data', address=owner_address, stack=[])
+            data = await self.run_get_method_stack(method='get_sale_data', address=owner_address, stack=[])
             if len(data) == 10:
-                market_address = read_address(Cell.one_from_boc(base64.b64decode(data[3].cell.bytes))).to_string()
+                market_address = data.address(3).to_string()
                 market_name = markets_adresses.get(market_address, '')
                 market_address = self._process_address(market_address)
-                real_owner = self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[5].cell.bytes))).to_string())
-                price = int(data[6].number.number)
+                real_owner = self._process_address(data.address(5).to_string())
+                price = data.int(6)
                 return {
                     'address': owner_address,
                     'market': {
@@ -137,11 +246,11 @@ class LsClient(TonlibClient):
                     }
                 }
             elif len(data) == 7:
-                market_address = read_address(Cell.one_from_boc(base64.b64decode(data[0].cell.bytes))).to_string()
+                market_address = data.address(0).to_string()
                 market_name = markets_adresses.get(market_address, '')
                 market_address = self._process_address(market_address)
-                real_owner = self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[2].cell.bytes))).to_string())
-                price = int(data[3].number.number)
+                real_owner = self._process_address(data.address(2).to_string())
+                price = data.int(3)
                 return {
                     'address': owner_address,
                     'market': {
@@ -155,11 +264,11 @@ class LsClient(TonlibClient):
                     }
                 }
             elif len(data) >= 11:
-                market_address = read_address(Cell.one_from_boc(base64.b64decode(data[3].cell.bytes))).to_string()
+                market_address = data.address(3).to_string()
                 market_name = markets_adresses.get(market_address, '')
                 market_address = self._process_address(market_address)
-                real_owner = self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[5].cell.bytes))).to_string())
-                price = max(int(data[6].number.number), int(data[16].number.number)) if len(data) >= 16 else int(data[6].number.number)
+                real_owner = self._process_address(data.address(5).to_string())
+                price = max(data.int(6), data.int(16)) if len(data) >= 16 else data.int(6)
                 return {
                     'address': owner_address,
                     'market': {
@@ -176,101 +285,149 @@ class LsClient(TonlibClient):
             return False
 
     async def get_collection(self, collection_address):
-        data = await self.run_get_method(method='get_collection_data', address=collection_address, stack=[])
-        collection_content_url = Cell.one_from_boc(base64.b64decode(data[1].cell.bytes)).bits.get_top_upped_array().decode().split('\x01')[-1]
+        data = await self.run_get_method_stack(method='get_collection_data', address=collection_address, stack=[])
+        collection_content_url = data.cell(1).bits.get_top_upped_array().decode().split('\x01')[-1]
         # if '\x01' in collection_content_url:
         #     collection_content_url = collection_content_url.split('\x01')[1]
-        collection_metadata = await get(collection_content_url)
+        collection_metadata = await self.get_metadata(collection_content_url)
         result = {
             'address': self._process_address(collection_address),
-            'next_item_index': int(data[0].number.number),
+            'next_item_index': data.int(0),
             'metadata': collection_metadata,
-            'owner': self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[2].cell.bytes))))
+            'owner': self._process_address(data.address(2))
         }
         return NftCollection(result, self)
 
     async def get_collection_items(self, collection: NftCollection, limit_per_one_request=0):
         if not collection.is_full():
             await collection.update()
-        if not limit_per_one_request:
-            items = await asyncio.gather(*[self.run_get_method(address=collection.address, method='get_nft_address_by_index', stack=[{"@type": "tvm.stackEntryNumber","number": {"@type": "tvm.numberDecimal","number": str(i)}}]) for i in range(collection.next_item_index)])
-        else:
-            items = []
-            for p in range(ceil(collection.next_item_index / limit_per_one_request)):
-                items += await asyncio.gather(*[self.run_get_method(address=collection.address, method='get_nft_address_by_index', stack=[{"@type": "tvm.stackEntryNumber", "number": {"@type": "tvm.numberDecimal", "number": str(i)}}]) for i in range(p * limit_per_one_request, min(collection.next_item_index, limit_per_one_request * (p + 1)))])
+        max_in_flight = limit_per_one_request or max(collection.next_item_index, 1)
+        return [item async for item in self.iter_collection_items(collection, max_in_flight=max_in_flight)]
+
+    async def iter_collection_items(self, collection: NftCollection, start_index: int = 0, max_in_flight: int = 100, ordered: bool = True):
+        """
+        async generator of collection NftItems (with .index set), keeps at most max_in_flight requests running.
+        with ordered=True items are yielded by index, so you can resume from last_item.index + 1
+        """
+        if not collection.is_full():
+            await collection.update()
+
+        async def get_item_address(i):
+            return await self.get_nft_address_by_index(collection.address, i)
 
-        result = []
-        for data in items:
-            result.append(NftItem(self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[0].cell.bytes)))), self))
-        return result
+        async for i, address in iter_bounded(get_item_address, range(start_index, collection.next_item_index), max_in_flight, ordered):
+            item = NftItem(address, self)
+            item.index = i
+            yield item
+
+    async def get_nft_address_by_index(self, collection_address: str, index: int):
+        request_stack = [{"@type": "tvm.stackEntryNumber", "number": {"@type": "tvm.numberDecimal", "number": str(index)}}]
+        data = await self.run_get_method_stack(address=collection_address, method='get_nft_address_by_index', stack=request_stack)
+        return self._process_address(data.address(0))
 
     async def get_transactions(self, address: str, limit: int = 10**9, limit_per_one_request: int = 100):
-        account = await self.find_account(address)
-        transactions = []
-        trs = await account.get_transactions(limit=limit_per_one_request)
-        for tr in trs:
-            transactions.append(tr.to_json())
-        while len(trs) == limit_per_one_request and len(transactions) < limit:
-            trs = await account.get_transactions(from_transaction_lt=trs[-1].to_json()['transaction_id']['lt'],
-                                                 from_transaction_hash=trs[-1].to_json()['transaction_id']['hash'],
-                                                 limit=limit)
-            for tr in trs[1:]:
-                transactions.append(tr.to_json())
-        result = []
-        for tr in transactions:
-            temp = {
-                'utime': tr['utime'],
-                'fee': tr['fee'],
-                'data': tr['data'],
-                'hash': tr['transaction_id']['hash'],
-                'lt': tr['transaction_id']['lt'],
-                'in_msg': {
-                    'created_lt': tr['in_msg']['created_lt'],
-                    'source': self._process_address(tr['in_msg']['source']['account_address']) if tr['in_msg']['source']['account_address'] else '',
-                    'destination': self._process_address(tr['in_msg']['destination']['account_address']) if tr['in_msg']['destination']['account_address'] else '',
-                    'value': tr['in_msg']['value'],
-                    'msg_data': tr['in_msg']['msg_data']['text'] if 'text' in tr['in_msg']['msg_data'] else tr['in_msg']['msg_data']['body']
-                },
-                'out_msgs': [
-                    {
-                        'created_lt': out_msg['created_lt'],
-                        'source': self._process_address(out_msg['source']['account_address']) if out_msg['source']['account_address'] else '',
-                        'destination': self._process_address(out_msg['destination']['account_address']) if out_msg['destination']['account_address'] else '',
-                        'value': out_msg['value'],
-                        'msg_data': out_msg['msg_data']['text'] if 'text' in out_msg['msg_data'] else out_msg['msg_data']['body']
-                    }
-                    for out_msg in tr['out_msgs']
-                ]
-            }
-            result.append(Transaction(temp))
-        return result[:limit]
+        return [tr async for tr in self.iter_transactions(address, limit=limit, limit_per_one_request=limit_per_one_request)]
+
+    async def iter_transactions(self, address: str, since_lt: int = 0, until_lt: int = None, limit: int = None, limit_per_one_request: int = 100):
+        """
+        async generator of Transactions with since_lt < lt <= until_lt from newest to oldest.
+        next page is requested while current one is processed, at most 2 pages are kept in memory.
+        """
+        async for tr in self._iter_transactions(address, since_lt, until_lt, limit, limit_per_one_request):
+            yield Transaction(tr)
+
+    def iter_transaction_batches(self, address: str, since_lt: int = 0, until_lt: int = None, limit: int = None, limit_per_one_request: int = 100,
+                                 batch_size: int = 10000, format: str = 'numpy'):
+        """
+        same as iter_transactions, but yields (transactions, out_msgs) columnar batches, format is 'numpy' or 'arrow'.
+        see columnar.TransactionColumns for columns
+        """
+        return iter_transaction_batches(self._iter_transactions(address, since_lt, until_lt, limit, limit_per_one_request), batch_size, format)
+
+    async def _iter_transactions(self, address: str, since_lt: int, until_lt: int, limit: int, limit_per_one_request: int):
+        fetched = 0
+
+        async def fetch_page(cursor):
+            nonlocal fetched
+            async with self.ls_pool.acquire() as client:
+                account = await client.find_account(address, preload_state=False)
+                if cursor is None:
+                    trs = await account.get_transactions(to_transaction_lt=since_lt, limit=limit_per_one_request)
+                else:
+                    trs = (await account.get_transactions(from_transaction_lt=cursor[0], from_transaction_hash=cursor[1],
+                                                          to_transaction_lt=since_lt, limit=limit_per_one_request))[1:]  # page starts with cursor transaction
+            page = [tr for tr in trs if until_lt is None or int(tr.transaction_id.lt) <= until_lt]
+            fetched += len(page)
+            if len(trs) < limit_per_one_request - (cursor is not None) or not trs or (limit is not None and fetched >= limit):
+                return page, None
+            return page, (trs[-1].transaction_id.lt, trs[-1].transaction_id.hash)
+
+        count = 0
+        async for page in iter_pages(fetch_page):
+            for tr in page:
+                if limit is not None and count >= limit:
+                    return
+                count += 1
+                yield self._process_transaction(tr.to_json())  # dicts in Transaction format
+
+    def _process_transaction(self, tr: dict):
+        temp = {
+            'utime': tr['utime'],
+            'fee': tr['fee'],
+            'data': tr['data'],
+            'hash': tr['transaction_id']['hash'],
+            'lt': tr['transaction_id']['lt'],
+            'in_msg': {
+                'created_lt': tr['in_msg']['created_lt'],
+                'source': self._process_address(tr['in_msg']['source']['account_address']) if tr['in_msg']['source']['account_address'] else '',
+                'destination': self._process_address(tr['in_msg']['destination']['account_address']) if tr['in_msg']['destination']['account_address'] else '',
+                'value': tr['in_msg']['value'],
+                'msg_data': tr['in_msg']['msg_data']['text'] if 'text' in tr['in_msg']['msg_data'] else tr['in_msg']['msg_data']['body']
+            },
+            'out_msgs': [
+                {
+                    'created_lt': out_msg['created_lt'],
+                    'source': self._process_address(out_msg['source']['account_address']) if out_msg['source']['account_address'] else '',
+                    'destination': self._process_address(out_msg['destination']['account_address']) if out_msg['destination']['account_address'] else '',
+                    'value': out_msg['value'],
+                    'msg_data': out_msg['msg_data']['text'] if 'text' in out_msg['msg_data'] else out_msg['msg_data']['body']
+                }
+                for out_msg in tr['out_msgs']
+            ]
+        }
+        return temp
 
     async def get_jetton_data(self, jetton_master_address: str):
-        data = await self.run_get_method(method='get_jetton_data', address=jetton_master_address, stack=[])
-        result = process_jetton_data(data[3].cell.bytes) if isinstance(process_jetton_data(data[3].cell.bytes), dict) else await get(process_jetton_data(data[3].cell.bytes))
+        data = await self.run_get_method_stack(method='get_jetton_data', address=jetton_master_address, stack=[])
+        content = process_jetton_data(data.cell(3))
+        result = content if isinstance(content, dict) else await self.get_metadata(content)
         result['address'] = self._process_address(jetton_master_address)
-        result['supply'] = int(data[0].number.number)
+        result['supply'] = data.int(0)
+        result['jetton_wallet_code'] = data.boc(4)
 
         return Jetton(result, self)
 
     async def send_boc(self, boc):
-        response = await super().send_boc(b64str_to_bytes(boc))
+        async with self.ls_pool.acquire() as client:
+            response = await TonlibClient.send_boc(client, b64str_to_bytes(boc))
         return response
 
     async def get_wallet_seqno(self, address: str):
-        data = await self.run_get_method(address=address, method='seqno', stack=[])
-        return int(data[0].number.number)
+        data = TonlibStack(await self._run_get_method(address=address, method='seqno', stack=[]))  # seqno should never be cached
+        return data.int(0)
 
     async def get_balance(self, address: str):
-        account = await self.find_account(address)
-        balance = await account.get_balance()
+        async with self.ls_pool.acquire() as client:
+            account = await self._get_account(client, address)
+            balance = int((await account.get_state()).balance)  # cached account keeps state loaded in current block
         if balance == -1:
             return 0
         return int(balance)
 
     async def get_state(self, address: str):
-        account = await self.find_account(address)
-        state = await account.get_state()
+        async with self.ls_pool.acquire() as client:
+            account = await self._get_account(client, address)
+            state = await account.get_state()
         state = state.to_json()
         if state['frozen_hash']:
             return 'frozen'
@@ -279,6 +436,16 @@ class LsClient(TonlibClient):
         else:
             return 'active'
 
+    async def get_code_and_data(self, address: str):
+        async with self.ls_pool.acquire() as client:
+            account = await self._get_account(client, address)
+            state = (await account.get_state()).to_json()
+        return {
+            'code': state['code'],
+            'data': state['data'],
+            'last_transaction_lt': state['last_transaction_id']['lt']
+        }
+
     async def get_jetton_wallet_address(self, jetton_master_address: str, owner_address: str):
         cell = Cell()
         cell.bits.write_address(Address(owner_address))
@@ -290,17 +457,17 @@ class LsClient(TonlibClient):
                     "bytes": bytes_to_b64str(cell.to_boc(False))
                 }
             }]
-        data = await self.run_get_method(address=jetton_master_address, method='get_wallet_address',stack=request_stack)
-        jetton_wallet_address = self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[0].cell.bytes))).to_string())
+        data = await self.run_get_method_stack(address=jetton_master_address, method='get_wallet_address',stack=request_stack)
+        jetton_wallet_address = self._process_address(data.address(0).to_string())
         return jetton_wallet_address
 
     async def get_jetton_wallet(self, jetton_wallet_address: str):
-        data = await self.run_get_method(address=jetton_wallet_address, method='get_wallet_data',stack=[])
+        data = await self.run_get_method_stack(address=jetton_wallet_address, method='get_wallet_data',stack=[])
         wallet = {
             'address': jetton_wallet_address,
-            'balance': int(data[0].number.number),
-            'owner': self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[1].cell.bytes)))),
-            'jetton_master_address': self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[2].cell.bytes)))),
-            'jetton_wallet_code': data[3].cell.bytes,
+            'balance': data.int(0),
+            'owner': self._process_address(data.address(1)),
+            'jetton_master_address': self._process_address(data.address(2)),
+            'jetton_wallet_code': data.boc(3),
         }
         return JettonWallet(wallet, self)
@@ -2,11 +2,17 @@ import unicodedata
 
 import aiohttp
 import base64
-from tonsdk.utils import Address
 from ..Contracts.NFT import NftItem, NftCollection
 from ..Contracts.Contract import Transaction
 from ..Contracts.Wallet import Wallet
 from ..Contracts.Jetton import Jetton
+from .session import ConnectionPool, PooledClient
+from .metadata import MetadataCache
+from .ipfs import IpfsGateways
+from .rate_limit import RateLimiter
+from .columnar import iter_transaction_batches
+from .utils import iter_pages
+from .address import format_address
 
 
 class TonApiError(BaseException):
@@ -24,12 +30,20 @@ async def process_response(response: aiohttp.ClientResponse):
         return response_dict
 
 
-class TonApiClient:
+class TonApiClient(PooledClient):
     def __init__(self,
                  key: str = None,  # api key from tonapi
                  addresses_form='user_friendly',  # addresses_form could be 'raw' or 'user_friendly'
-                 testnet=False
+                 testnet=False,
+                 pool: ConnectionPool = None,  # pass one ConnectionPool to several clients to share connections
+                 rate_limiter: RateLimiter = None,  # pass one RateLimiter to several clients to share limits
+                 metadata_cache: MetadataCache = None,  # in memory cache by default, False - don't cache offchain metadata
+                 ipfs_gateways: IpfsGateways = None  # gateways for ipfs metadata, IpfsGateways() by default
                  ):
+        self._set_pool(pool)
+        self._set_rate_limiter(rate_limiter, key)
+        self._set_metadata_cache(metadata_cache)
+        self._set_ipfs_gateways(ipfs_gateways)
         self.form = addresses_form
         if testnet:
             self.testnet = True
@@ -45,207 +59,229 @@ class TonApiClient:
             self.headers = {}
 
     def _process_address(self, address):
-        if self.form == 'raw':
-            return Address(address).to_string(is_user_friendly=False)
-        elif self.form == 'user_friendly':
-            if self.testnet:
-                return Address(address).to_string(True, True, True, True)
-            else:
-                return Address(address).to_string(True, True, True)
+        return format_address(address, self.form, self.testnet)
 
     async def get_nft_owner(self, nft_address: str):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'nft/getItems'
-            params = {
-                'addresses': [nft_address]
-            }
-            response = await session.get(url=url, params=params, headers=self.headers)
+        url = self.base_url + 'nft/getItems'
+        params = {
+            'addresses': [nft_address]
+        }
+        async with self.limit():
+            response = await self.session.get(url=url, params=params, headers=self.headers)
             response = await process_response(response)
-            item = response['nft_items'][0]
-            if 'sale' in item:
-                return self._process_address(item['sale']['owner']['address'])
-            return Wallet(self, self._process_address(item['owner']['address']))
+        item = response['nft_items'][0]
+        if 'sale' in item:
+            return self._process_address(item['sale']['owner']['address'])
+        return Wallet(self, self._process_address(item['owner']['address']))
 
     async def get_nft_items(self, nft_addresses: list):
         result = []
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'nft/getItems'
-            params = {
-                'addresses': ','.join(nft_addresses)
-            }
-            response = await session.get(url=url, params=params, headers=self.headers)
+        url = self.base_url + 'nft/getItems'
+        params = {
+            'addresses': ','.join(nft_addresses)
+        }
+        async with self.limit():
+            response = await self.session.get(url=url, params=params, headers=self.headers)
             response = await process_response(response)
-            for item in response['nft_items']:
-                temp = {
-                    'address': self._process_address(item['address']),
-                    'collection': {
-                        'address': self._process_address(item['collection']['address']),
-                        'name': item['collection']['name'],
+        for item in response['nft_items']:
+            temp = {
+                'address': self._process_address(item['address']),
+                'collection': {
+                    'address': self._process_address(item['collection']['address']),
+                    'name': item['collection']['name'],
+                },
+                'collection_address': self._process_address(item['collection']['address']),
+                'index': item['index'],
+                'metadata': item['metadata'],
+                'owner': self._process_address(item['owner']['address'])
+            }
+            if 'sale' in item:
+                temp['sale'] = {
+                    'address': self._process_address(item['sale']['address']),
+                    'market': {
+                        'address': self._process_address(item['sale']['market']['address']),
+                        'name': item['sale']['market']['name']
                     },
-                    'collection_address': self._process_address(item['collection']['address']),
-                    'index': item['index'],
-                    'metadata': item['metadata'],
-                    'owner': self._process_address(item['owner']['address'])
-                }
-                if 'sale' in item:
-                    temp['sale'] = {
-                        'address': self._process_address(item['sale']['address']),
-                        'market': {
-                            'address': self._process_address(item['sale']['market']['address']),
-                            'name': item['sale']['market']['name']
-                        },
-                        'owner': self._process_address(item['sale']['owner']['address']),
-                        'price': {
-                            'token_name': item['sale']['price']['token_name'],
-                            'value': item['sale']['price']['value'],
-                        }
+                    'owner': self._process_address(item['sale']['owner']['address']),
+                    'price': {
+                        'token_name': item['sale']['price']['token_name'],
+                        'value': item['sale']['price']['value'],
                     }
-                result.append(NftItem(temp, self))
-            return result
+                }
+            result.append(NftItem(temp, self))
+        return result
 
     async def get_collection(self, collection_address):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'nft/getCollection'
-            params = {
-                'account': collection_address
-            }
-            response = await session.get(url=url, params=params, headers=self.headers)
+        url = self.base_url + 'nft/getCollection'
+        params = {
+            'account': collection_address
+        }
+        async with self.limit():
+            response = await self.session.get(url=url, params=params, headers=self.headers)
             response = await process_response(response)
-            result = {
-                'address': self._process_address(response['address']),
-                'metadata': response['metadata'],
-                'next_item_index': response['next_item_index'],
-                'owner': self._process_address(response['owner']['address'])
-            }
-            return NftCollection(result, self)
+        result = {
+            'address': self._process_address(response['address']),
+            'metadata': response['metadata'],
+            'next_item_index': response['next_item_index'],
+            'owner': self._process_address(response['owner']['address'])
+        }
+        return NftCollection(result, self)
 
     async def get_collection_items(self, collection: NftCollection, limit_per_one_request=1000):
-        async with aiohttp.ClientSession() as session:
-            if not limit_per_one_request:
-                limit_per_one_request = 1000
-            url = self.base_url + 'nft/searchItems'
-            i = 0
-            items = []
-            while True:
-                params = {
-                    'collection': collection.address,
-                    'limit': limit_per_one_request,
-                    'offset': i
-                }
-                response = await session.get(url=url, params=params, headers=self.headers)
+        if not limit_per_one_request:
+            limit_per_one_request = 1000
+        url = self.base_url + 'nft/searchItems'
+        i = 0
+        items = []
+        while True:
+            params = {
+                'collection': collection.address,
+                'limit': limit_per_one_request,
+                'offset': i
+            }
+            async with self.limit():
+                response = await self.session.get(url=url, params=params, headers=self.headers)
                 response = await process_response(response)
-                items += [NftItem(self._process_address(item['address']), self) for item in response['nft_items']]
-                if len(response['nft_items']) < limit_per_one_request:
-                    break
-                i += limit_per_one_request
-            return items
+            items += [NftItem(self._process_address(item['address']), self) for item in response['nft_items']]
+            if len(response['nft_items']) < limit_per_one_request:
+                break
+            i += limit_per_one_request
+        return items
 
     async def get_transactions(self, address: str, limit: int = 10**9, limit_per_one_request: int = 100):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'blockchain/getTransactions'
-            transactions = []
+        return [tr async for tr in self.iter_transactions(address, limit=limit, limit_per_one_request=limit_per_one_request)]
+
+    async def iter_transactions(self, address: str, since_lt: int = 0, until_lt: int = None, limit: int = None, limit_per_one_request: int = 100):
+        """
+        async generator of Transactions with since_lt < lt <= until_lt from newest to oldest.
+        next page is requested while current one is processed, at most 2 pages are kept in memory.
+        """
+        async for tr in self._iter_transactions(address, since_lt, until_lt, limit, limit_per_one_request):
+            yield Transaction(tr)
+
+    def iter_transaction_batches(self, address: str, since_lt: int = 0, until_lt: int = None, limit: int = None, limit_per_one_request: int = 100,
+                                 batch_size: int = 10000, format: str = 'numpy'):
+        """
+        same as iter_transactions, but yields (transactions, out_msgs) columnar batches, format is 'numpy' or 'arrow'.
+        see columnar.TransactionColumns for columns
+        """
+        return iter_transaction_batches(self._iter_transactions(address, since_lt, until_lt, limit, limit_per_one_request), batch_size, format)
+
+    async def _iter_transactions(self, address: str, since_lt: int, until_lt: int, limit: int, limit_per_one_request: int):
+        url = self.base_url + 'blockchain/getTransactions'
+        fetched = 0
+        last_lt = None
+
+        async def fetch_page(max_lt):
+            nonlocal fetched, last_lt
             params = {
                 'account': address,
                 'limit': limit_per_one_request,
-                'minLt': 0
+                'minLt': since_lt
             }
-            response = await session.get(url=url, params=params, headers=self.headers)
-            response = await process_response(response)
-            transactions += response['transactions']
-            while len(response['transactions']) == limit_per_one_request and len(transactions) < limit:
-                params = {
-                    'account': address,
-                    'limit': limit_per_one_request,
-                    'maxLt': transactions[-1]['lt'],
-                    'minLt': 0
-                }
-                response = await session.get(url=url, params=params, headers=self.headers)
+            if max_lt is not None:
+                params['maxLt'] = max_lt
+            async with self.limit():
+                response = await self.session.get(url=url, params=params, headers=self.headers)
                 response = await process_response(response)
-                transactions += response['transactions'][1:]
-            result = []
-            for tr in transactions:
-                temp = {
-                    'utime': tr['utime'],
-                    'fee': tr['fee'],
-                    'data': tr['data'],
-                    'hash': base64.b64encode(s=bytearray.fromhex(tr['hash'])).decode(),
-                    'lt': tr['lt'],
-                    'in_msg': {
-                        'created_lt': tr['in_msg']['created_lt'],
-                        'source': self._process_address(tr['in_msg']['source']['address']) if 'source' in tr['in_msg'] else '',
-                        'destination': self._process_address(tr['in_msg']['destination']['address']) if 'destination' in tr['in_msg'] else '',
-                        'value': tr['in_msg']['value'],
-                        'msg_data': tr['in_msg']['msg_data']
-                    },
-                    'out_msgs': [
-                        {
-                            'created_lt': out_msg['created_lt'],
-                            'source': self._process_address(out_msg['source']['address']) if 'source' in out_msg else '',
-                            'destination': self._process_address(out_msg['destination']['address']) if 'destination' in out_msg else '',
-                            'value': out_msg['value'],
-                            'msg_data': out_msg['msg_data']
-                        }
-                        for out_msg in tr['out_msgs']
-                    ]
+            transactions = response['transactions']
+            # maxLt is inclusive, so next page starts with the last transaction of previous one
+            page = [tr for tr in transactions if since_lt < tr['lt'] and (until_lt is None or tr['lt'] <= until_lt) and (last_lt is None or tr['lt'] < last_lt)]
+            last_lt = transactions[-1]['lt'] if transactions else last_lt
+            fetched += len(page)
+            if len(transactions) < limit_per_one_request or last_lt <= since_lt or (limit is not None and fetched >= limit):
+                return page, None
+            return page, last_lt
+
+        count = 0
+        async for page in iter_pages(fetch_page, until_lt):
+            for tr in page:
+                if limit is not None and count >= limit:
+                    return
+                count += 1
+                yield self._process_transaction(tr)  # dicts in Transaction format
+
+    def _process_transaction(self, tr: dict):
+        temp = {
+            'utime': tr['utime'],
+            'fee': tr['fee'],
+            'data': tr['data'],
+            'hash': base64.b64encode(s=bytearray.fromhex(tr['hash'])).decode(),
+            'lt': tr['lt'],
+            'in_msg': {
+                'created_lt': tr['in_msg']['created_lt'],
+                'source': self._process_address(tr['in_msg']['source']['address']) if 'source' in tr['in_msg'] else '',
+                'destination': self._process_address(tr['in_msg']['destination']['address']) if 'destination' in tr['in_msg'] else '',
+                'value': tr['in_msg']['value'],
+                'msg_data': tr['in_msg']['msg_data']
+            },
+            'out_msgs': [
+                {
+                    'created_lt': out_msg['created_lt'],
+                    'source': self._process_address(out_msg['source']['address']) if 'source' in out_msg else '',
+                    'destination': self._process_address(out_msg['destination']['address']) if 'destination' in out_msg else '',
+                    'value': out_msg['value'],
+                    'msg_data': out_msg['msg_data']
                 }
-                result.append(Transaction(temp))
-            return result[:limit]
+                for out_msg in tr['out_msgs']
+            ]
+        }
+        return temp
 
     async def get_jetton_data(self, jetton_master_address: str):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'jetton/getInfo'
-            params = {
-                'account': jetton_master_address
-            }
-            response = await session.get(url=url, params=params, headers=self.headers)
+        url = self.base_url + 'jetton/getInfo'
+        params = {
+            'account': jetton_master_address
+        }
+        async with self.limit():
+            response = await self.session.get(url=url, params=params, headers=self.headers)
             response = await process_response(response)
-            result = response['metadata']
-            result['description'] = unicodedata.normalize("NFKD", result['description'])
-            result['address'] = self._process_address(result['address'])
-            result['supply'] = response['total_supply']
-            return Jetton(result, self)
+        result = response['metadata']
+        result['description'] = unicodedata.normalize("NFKD", result['description'])
+        result['address'] = self._process_address(result['address'])
+        result['supply'] = response['total_supply']
+        return Jetton(result, self)
 
     async def send_boc(self, boc):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'send/boc'
-            data = {
-                'boc': boc
-            }
-            response = await session.post(url=url, json=data, headers=self.headers)
+        url = self.base_url + 'send/boc'
+        data = {
+            'boc': boc
+        }
+        async with self.limit(), self.session.post(url=url, json=data, headers=self.headers) as response:
             return response.status
 
     async def get_wallet_seqno(self, address: str):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'wallet/getSeqno'
-            params = {
-                'account': address
-            }
-            response = await session.get(url=url, params=params, headers=self.headers)
+        url = self.base_url + 'wallet/getSeqno'
+        params = {
+            'account': address
+        }
+        async with self.limit():
+            response = await self.session.get(url=url, params=params, headers=self.headers)
             response = await process_response(response)
-            seqno = response['seqno']
-            return seqno
+        seqno = response['seqno']
+        return seqno
 
     async def get_balance(self, address: str):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'account/getInfo'
-            params = {
-                'account': address
-            }
-            response = await session.get(url=url, params=params, headers=self.headers)
+        url = self.base_url + 'account/getInfo'
+        params = {
+            'account': address
+        }
+        async with self.limit():
+            response = await self.session.get(url=url, params=params, headers=self.headers)
             response = await process_response(response)
-            balance = response['balance']
-            return int(balance)
+        balance = response['balance']
+        return int(balance)
 
     async def get_state(self, address: str):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'account/getInfo'
-            params = {
-                'account': address
-            }
-            response = await session.get(url=url, params=params, headers=self.headers)
+        url = self.base_url + 'account/getInfo'
+        params = {
+            'account': address
+        }
+        async with self.limit():
+            response = await self.session.get(url=url, params=params, headers=self.headers)
             response = await process_response(response)
-            state = response['status']
-            if state == 'empty' or state == 'uninit':
-                return 'uninitialized'
-            else:
-                return state
+        state = response['status']
+        if state == 'empty' or state == 'uninit':
+            return 'uninitialized'
+        else:
+            return state
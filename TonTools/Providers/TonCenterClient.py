@@ -1,18 +1,23 @@
 import asyncio
-from math import ceil
 
 import aiohttp
-import base64
 from tonsdk.boc import Cell
-from ton.utils.cell import read_address
 from tonsdk.utils import Address, bytes_to_b64str
 
 from ..Contracts.NFT import NftItem, NftCollection
 from ..Contracts.Contract import Transaction
 from ..Contracts.Wallet import Wallet
 from ..Contracts.Jetton import Jetton, JettonWallet
-from .utils import markets_adresses, get, process_jetton_data
-from ._orbs_ton_access import get_http_endpoint
+from .utils import markets_adresses, process_jetton_data, iter_bounded, iter_pages
+from ._orbs_ton_access import get_http_endpoint, get_http_endpoint_async
+from .session import ConnectionPool, PooledClient
+from .metadata import MetadataCache
+from .ipfs import IpfsGateways
+from .cache import RequestCoalescer
+from .stack import TonCenterStack, unique_calls, collect_results
+from .rate_limit import RateLimiter
+from .columnar import iter_transaction_batches
+from .address import format_address
 
 
 class TonCenterClientError(BaseException):
@@ -34,19 +39,30 @@ async def process_response(response: aiohttp.ClientResponse):
         return response_dict
 
 
-class TonCenterClient:
+class TonCenterClient(PooledClient):
+    json_rpc_batch_rejected = (200, 400, 404, 405, 422)  # statuses (200 with non-list response) of jsonRPC endpoint without batches
 
     def __init__(self,
                  key: str = None,
                  addresses_form='user_friendly',  # addresses_form could be 'raw' or 'user_friendly'.
                  base_url=None,
                  testnet=False,
-                 orbs_access=False  # https://www.orbs.com/ton-access/
+                 orbs_access=False,  # https://www.orbs.com/ton-access/
+                 pool: ConnectionPool = None,  # pass one ConnectionPool to several clients to share connections
+                 rate_limiter: RateLimiter = None,  # e.g. RateLimiter(rps=10) for toncenter with api key
+                 get_methods_cache_ttl: float = 0,  # seconds to reuse get methods results, identical running get methods are always sent once
+                 metadata_cache: MetadataCache = None,  # in memory cache by default, False - don't cache offchain metadata
+                 ipfs_gateways: IpfsGateways = None  # gateways for ipfs metadata, IpfsGateways() by default
                  ):
+        self._set_pool(pool)
+        self._set_rate_limiter(rate_limiter, key)
+        self._set_metadata_cache(metadata_cache)
+        self._set_ipfs_gateways(ipfs_gateways)
+        self.get_methods_coalescer = RequestCoalescer(get_methods_cache_ttl)
         self.form = addresses_form
-        self.delay = 0
         self.base_url = base_url
         self.testnet = testnet
+        self.json_rpc_batch = True  # set to False if jsonRPC endpoint doesn't accept batches
         if orbs_access:
             self.headers = {}
             if testnet:
@@ -71,39 +87,106 @@ class TonCenterClient:
         else:
             self.headers = {}
 
+    @classmethod
+    async def create(cls, *args, orbs_access=False, **kwargs):
+        """
+        same as TonCenterClient(...), but orbs ton access topology is fetched without blocking the event loop
+        and reused by clients created in the next minute
+        """
+        client = cls(*args, **kwargs)
+        if orbs_access:
+            client.headers = {}
+            config = {'network': 'testnet', 'protocol': 'rest'} if client.testnet else {'protocol': 'rest'}
+            client.base_url = await get_http_endpoint_async(config, client.session)
+        return client
+
     def _process_address(self, address):
-        if self.form == 'raw':
-            return Address(address).to_string(is_user_friendly=False)
-        elif self.form == 'user_friendly':
-            if self.testnet:
-                return Address(address).to_string(True, True, True, True)
-            else:
-                return Address(address).to_string(True, True, True)
+        return format_address(address, self.form, self.testnet)
 
     def set_delay(self, delay: float = 0.1):
-        self.delay = delay
+        """
+        Deprecated, use rate_limiter parameter. Limits requests to one per `delay` seconds.
+        """
+        self._set_rate_limiter(RateLimiter(rps=1 / delay, burst=1) if delay else None, self.rate_limit_key)
 
     async def run_get_method(self, method: str, address: str, stack: list):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'runGetMethod'
-            data = {
-                "address": address,
-                "method": method,
-                "stack": stack
-            }
-            await asyncio.sleep(self.delay)
-            response = await session.post(url=url, json=data, headers=self.headers)
+        return (await self.run_get_method_stack(method, address, stack)).raw
+
+    async def run_get_method_stack(self, method: str, address: str, stack: list) -> TonCenterStack:
+        """
+        same as run_get_method, but returns lazily decoded stack: data.int(0), data.cell(1), data.address(2)
+        """
+        key = self.get_methods_coalescer.get_method_key(address, method, stack)
+        # decoded stack is shared by coalesced requests, so every entry is decoded once
+        return await self.get_methods_coalescer.run(key, self._run_get_method_stack, method, address, stack)
+
+    async def _run_get_method_stack(self, method: str, address: str, stack: list):
+        return TonCenterStack(await self._run_get_method(method, address, stack))
+
+    async def _run_get_method(self, method: str, address: str, stack: list):
+        url = self.base_url + 'runGetMethod'
+        data = {
+            "address": address,
+            "method": method,
+            "stack": stack
+        }
+        async with self.limit():
+            response = await self.session.post(url=url, json=data, headers=self.headers)
             response = await process_response(response)
-            if response['result']['exit_code'] != 0:
-                raise GetMethodError(
-                    f'get method {method} for address {self._process_address(address)} exit code is {response["result"]["exit_code"]}')
-            return response['result']['stack']
+        if response['result']['exit_code'] != 0:
+            raise GetMethodError(
+                f'get method {method} for address {self._process_address(address)} exit code is {response["result"]["exit_code"]}')
+        return response['result']['stack']
+
+    async def run_get_methods(self, calls: list, return_exceptions: bool = False, batch_size: int = 100) -> list:
+        """
+        runs [(address, method, stack), ...] in JSON-RPC batches of batch_size calls, returns TonCenterStack for every call
+        in the same order. identical calls are sent once. if return_exceptions is True failed calls are returned as
+        exceptions instead of raising the first one
+        """
+        unique, indexes = unique_calls(calls, self.get_methods_coalescer.get_method_key)
+        chunks = [unique[i:i + batch_size] for i in range(0, len(unique), batch_size)]
+        results = sum(await asyncio.gather(*[self._run_get_methods_batch(chunk) for chunk in chunks]), [])
+        return collect_results(results, indexes, return_exceptions)
+
+    async def _run_get_methods_batch(self, calls: list):
+        if self.json_rpc_batch:
+            payload = [
+                {'id': i, 'jsonrpc': '2.0', 'method': 'runGetMethod', 'params': {'address': address, 'method': method, 'stack': stack}}
+                for i, (address, method, stack) in enumerate(calls)
+            ]
+            async with self.limit():
+                response = await self.session.post(url=self.base_url + 'jsonRPC', json=payload, headers=self.headers)
+                try:
+                    responses = await response.json()
+                except:
+                    responses = None
+            if response.status == 200 and isinstance(responses, list):
+                responses = {r['id']: r for r in responses}
+                return [self._process_get_method_response(responses.get(i), *call) for i, call in enumerate(calls)]
+            if response.status not in self.json_rpc_batch_rejected:
+                # e.g. 429 or 5xx, batches are still tried next time
+                error = TonCenterClientError(f'TonCenter jsonRPC batch failed with status {response.status}')
+                return [error for _ in calls]
+            self.json_rpc_batch = False  # e.g. self-hosted api without batches, don't try again
+        return await asyncio.gather(*[self.run_get_method_stack(method, address, stack) for address, method, stack in calls],
+                                    return_exceptions=True)
+
+    def _process_get_method_response(self, response: dict, address: str, method: str, stack: list):
+        if response is None:
+            return TonCenterClientError(f'no response for get method {method} for address {self._process_address(address)}')
+        if not response.get('ok'):
+            return TonCenterClientError(f'TonCenter failed with error: {response.get("error")}')
+        if response['result']['exit_code'] != 0:
+            return GetMethodError(
+                f'get method {method} for address {self._process_address(address)} exit code is {response["result"]["exit_code"]}')
+        return TonCenterStack(response['result']['stack'])
 
     async def get_nft_owner(self, nft_address: str):
-        sale = await self._get_nft_sale(nft_address)
+        data = await self.run_get_method_stack(method='get_nft_data', address=nft_address, stack=[])
+        sale = await self._get_nft_sale(nft_address, data)
         if not sale:
-            data = await self.run_get_method(method='get_nft_data', address=nft_address, stack=[])
-            owner_address = read_address(Cell.one_from_boc(base64.b64decode(data[3][1]['bytes']))).to_string()
+            owner_address = data.address(3).to_string()
         else:
             owner_address = sale['owner']
         return Wallet(self, self._process_address(owner_address))
@@ -112,43 +195,43 @@ class TonCenterClient:
         return await asyncio.gather(*[self._get_nft_item(nft_address) for nft_address in nft_addresses])
 
     async def _get_nft_item(self, nft_address: str):
-        data = await self.run_get_method(method='get_nft_data', address=nft_address, stack=[])
+        data = await self.run_get_method_stack(method='get_nft_data', address=nft_address, stack=[])
 
         result = {
             'address': self._process_address(nft_address),
-            'index': int(data[1][1], 16),
-            'collection_address': self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[2][1]['bytes'])))),
-            'owner': self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[3][1]['bytes'])))),
+            'index': data.int(1),
+            'collection_address': self._process_address(data.address(2)),
+            'owner': self._process_address(data.address(3)),
             'collection': {
-                'address': self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[2][1]['bytes']))))
+                'address': self._process_address(data.address(2))
             }
         }
-        content_data = await self.run_get_method(method='get_nft_content', address=result['collection_address'], stack=[['num', result['index']], ['tvm.Cell', data[4][1]['bytes']]])
-        collection_content_url = Cell.one_from_boc(base64.b64decode(content_data[0][1]['bytes'])).bits.get_top_upped_array().decode().split('\x01')[-1]
+        content_data = await self.run_get_method_stack(method='get_nft_content', address=result['collection_address'], stack=[['num', result['index']], ['tvm.Cell', data.boc(4)]])
+        collection_content_url = content_data.cell(0).bits.get_top_upped_array().decode().split('\x01')[-1]
         # if '\x01' in collection_content_url:
         #     collection_content_url = collection_content_url.split('\x01')[1]
-        nft_content_url = collection_content_url + Cell.one_from_boc(base64.b64decode(content_data[0][1]['bytes'])).refs[0].bits.get_top_upped_array().decode()
+        nft_content_url = collection_content_url + content_data.cell(0).refs[0].bits.get_top_upped_array().decode()
 
-        result['metadata'] = await get(nft_content_url)
+        result['metadata'] = await self.get_metadata(nft_content_url)
 
-        sale = await self._get_nft_sale(nft_address)
+        sale = await self._get_nft_sale(nft_address, data)
         if not sale:
             return NftItem(result, provider=self)
         else:
             result['sale'] = sale
             return NftItem(result, provider=self)
 
-    async def _get_nft_sale(self, nft_address: str):
-        data = await self.run_get_method(method='get_nft_data', address=nft_address, stack=[])
-        owner_address = self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[3][1]['bytes']))).to_string())
+    async def _get_nft_sale(self, nft_address: str, nft_data: TonCenterStack = None):
+        data = nft_data or await self.run_get_method_stack(method='get_nft_data', address=nft_address, stack=[])
+        owner_address = self._process_address(data.address(3).to_string())
         try:
-            data = await self.run_get_method(method='get_sale_data', address=owner_address, stack=[])
+            data = await self.run_get_method_stack(method='get_sale_data', address=owner_address, stack=[])
             if len(data) == 10:
-                market_address = read_address(Cell.one_from_boc(base64.b64decode(data[3][1]['bytes']))).to_string()
+                market_address = data.address(3).to_string()
                 market_name = markets_adresses.get(market_address, '')
                 market_address = self._process_address(market_address)
-                real_owner = self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[5][1]['bytes']))).to_string())
-                price = int(data[6][1], 16)
+                real_owner = self._process_address(data.address(5).to_string())
+                price = data.int(6)
                 return {
                     'address': owner_address,
                     'market': {
@@ -162,11 +245,11 @@ class TonCenterClient:
                     }
                 }
             elif len(data) == 7:
-                market_address = read_address(Cell.one_from_boc(base64.b64decode(data[0][1]['bytes']))).to_string()
+                market_address = data.address(0).to_string()
                 market_name = markets_adresses.get(market_address, '')
                 market_address = self._process_address(market_address)
-                real_owner = self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[2][1]['bytes']))).to_string())
-                price = int(data[3][1], 16)
+                real_owner = self._process_address(data.address(2).to_string())
+                price = data.int(3)
                 return {
                     'address': owner_address,
                     'market': {
@@ -180,11 +263,11 @@ class TonCenterClient:
                     }
                 }
             elif len(data) >= 11:
-                market_address = read_address(Cell.one_from_boc(base64.b64decode(data[3][1]['bytes']))).to_string()
+                market_address = data.address(3).to_string()
                 market_name = markets_adresses.get(market_address, '')
                 market_address = self._process_address(market_address)
-                real_owner = self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[5][1]['bytes']))).to_string())
-                price = max(int(data[6][1], 16), int(data[16][1], 16)) if len(data) >= 16 else int(data[6][1], 16)
+                real_owner = self._process_address(data.address(5).to_string())
+                price = max(data.int(6), data.int(16)) if len(data) >= 16 else data.int(6)
                 return {
                     'address': owner_address,
                     'market': {
@@ -201,142 +284,192 @@ class TonCenterClient:
             return False
 
     async def get_collection(self, collection_address):
-        data = await self.run_get_method(method='get_collection_data', address=collection_address, stack=[])
-        collection_content_url = Cell.one_from_boc(base64.b64decode(data[1][1]['bytes'])).bits.get_top_upped_array().decode().split('\x01')[-1]
+        data = await self.run_get_method_stack(method='get_collection_data', address=collection_address, stack=[])
+        collection_content_url = data.cell(1).bits.get_top_upped_array().decode().split('\x01')[-1]
         # if '\x01' in collection_content_url:
         #     collection_content_url = collection_content_url.split('\x01')[1]
-        collection_metadata = await get(collection_content_url)
+        collection_metadata = await self.get_metadata(collection_content_url)
         result = {
             'address': self._process_address(collection_address),
-            'next_item_index': int(data[0][1], 16),
+            'next_item_index': data.int(0),
             'metadata': collection_metadata,
-            'owner': self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[2][1]['bytes']))))
+            'owner': self._process_address(data.address(2))
         }
         return NftCollection(result, self)
 
     async def get_collection_items(self, collection: NftCollection, limit_per_one_request=0):
         if not collection.is_full():
             await collection.update()
-        if not limit_per_one_request:
-            items = await asyncio.gather(*[self.run_get_method(address=collection.address, method='get_nft_address_by_index', stack=[['num', i]]) for i in range(collection.next_item_index)])
-        else:
-            items = []
-            for p in range(ceil(collection.next_item_index / limit_per_one_request)):
-                items += await asyncio.gather(*[
-                    self.run_get_method(address=collection.address, method='get_nft_address_by_index',stack=[['num', i]]) for i in range(p * limit_per_one_request, min(collection.next_item_index, limit_per_one_request * (p + 1)))])
+        max_in_flight = limit_per_one_request or max(collection.next_item_index, 1)
+        return [item async for item in self.iter_collection_items(collection, max_in_flight=max_in_flight)]
+
+    async def iter_collection_items(self, collection: NftCollection, start_index: int = 0, max_in_flight: int = 100, ordered: bool = True):
+        """
+        async generator of collection NftItems (with .index set), keeps at most max_in_flight requests running.
+        with ordered=True items are yielded by index, so you can resume from last_item.index + 1
+        """
+        if not collection.is_full():
+            await collection.update()
+
+        async def get_item_address(i):
+            return await self.get_nft_address_by_index(collection.address, i)
+
+        async for i, address in iter_bounded(get_item_address, range(start_index, collection.next_item_index), max_in_flight, ordered):
+            item = NftItem(address, self)
+            item.index = i
+            yield item
 
-        result = []
-        for data in items:
-            result.append(NftItem(self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[0][1]['bytes'])))), self))
-        return result
+    async def get_nft_address_by_index(self, collection_address: str, index: int):
+        data = await self.run_get_method_stack(address=collection_address, method='get_nft_address_by_index', stack=[['num', index]])
+        return self._process_address(data.address(0))
 
     async def get_transactions(self, address: str, limit: int = 10**9, limit_per_one_request: int = 100):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'getTransactions'
-            transactions = []
+        return [tr async for tr in self.iter_transactions(address, limit=limit, limit_per_one_request=limit_per_one_request)]
+
+    async def iter_transactions(self, address: str, since_lt: int = 0, until_lt: int = None, limit: int = None, limit_per_one_request: int = 100):
+        """
+        async generator of Transactions with since_lt < lt <= until_lt from newest to oldest.
+        next page is requested while current one is processed, at most 2 pages are kept in memory.
+        """
+        async for tr in self._iter_transactions(address, since_lt, until_lt, limit, limit_per_one_request):
+            yield Transaction(tr)
+
+    def iter_transaction_batches(self, address: str, since_lt: int = 0, until_lt: int = None, limit: int = None, limit_per_one_request: int = 100,
+                                 batch_size: int = 10000, format: str = 'numpy'):
+        """
+        same as iter_transactions, but yields (transactions, out_msgs) columnar batches, format is 'numpy' or 'arrow'.
+        see columnar.TransactionColumns for columns
+        """
+        return iter_transaction_batches(self._iter_transactions(address, since_lt, until_lt, limit, limit_per_one_request), batch_size, format)
+
+    async def _iter_transactions(self, address: str, since_lt: int, until_lt: int, limit: int, limit_per_one_request: int):
+        url = self.base_url + 'getTransactions'
+        fetched = 0
+
+        async def fetch_page(cursor):
+            nonlocal fetched
             params = {
                 'address': address,
                 'limit': limit_per_one_request,
                 'archival': 1
             }
-            response = await session.get(url=url, params=params, headers=self.headers)
-            response = await process_response(response)
-            transactions += response['result']
-            while len(response['result']) == limit_per_one_request and len(transactions) < limit:
-                params = {
-                    'address': address,
-                    'limit': limit_per_one_request,
-                    'hash': transactions[-1]['transaction_id']['hash'],
-                    'lt': transactions[-1]['transaction_id']['lt'],
-                    'archival': 1
-                }
-                response = await session.get(url=url, params=params, headers=self.headers)
+            if cursor is not None:
+                params['lt'], params['hash'] = cursor
+            async with self.limit():
+                response = await self.session.get(url=url, params=params, headers=self.headers)
                 response = await process_response(response)
-                transactions += response['result'][1:]
-            result = []
-            for tr in transactions:
-                temp = {
-                    'utime': tr['utime'],
-                    'fee': tr['fee'],
-                    'data': tr['data'],
-                    'hash': tr['transaction_id']['hash'],
-                    'lt': tr['transaction_id']['lt'],
-                    'in_msg': {
-                        'created_lt': tr['in_msg']['created_lt'],
-                        'source': self._process_address(tr['in_msg']['source']) if tr['in_msg']['source'] else '',
-                        'destination': self._process_address(tr['in_msg']['destination']) if tr['in_msg']['destination'] else '',
-                        'value': tr['in_msg']['value'],
-                        'msg_data': tr['in_msg']['msg_data']['text'] if 'text' in tr['in_msg']['msg_data'] else tr['in_msg']['msg_data']['body']
-                    },
-                    'out_msgs': [
-                        {
-                            'created_lt': out_msg['created_lt'],
-                            'source': self._process_address(out_msg['source']) if out_msg['source'] else '',
-                            'destination': self._process_address(out_msg['destination']) if out_msg['destination'] else '',
-                            'value': out_msg['value'],
-                            'msg_data': out_msg['msg_data']['text'] if 'text' in out_msg['msg_data'] else out_msg['msg_data']['body']
-                        }
-                        for out_msg in tr['out_msgs']
-                    ]
+            transactions = response['result'] if cursor is None else response['result'][1:]  # page starts with cursor transaction
+            page = [tr for tr in transactions if since_lt < int(tr['transaction_id']['lt']) and (until_lt is None or int(tr['transaction_id']['lt']) <= until_lt)]
+            fetched += len(page)
+            if not transactions or len(response['result']) < limit_per_one_request or int(transactions[-1]['transaction_id']['lt']) <= since_lt or (limit is not None and fetched >= limit):
+                return page, None
+            return page, (transactions[-1]['transaction_id']['lt'], transactions[-1]['transaction_id']['hash'])
+
+        count = 0
+        async for page in iter_pages(fetch_page):
+            for tr in page:
+                if limit is not None and count >= limit:
+                    return
+                count += 1
+                yield self._process_transaction(tr)  # dicts in Transaction format
+
+    def _process_transaction(self, tr: dict):
+        temp = {
+            'utime': tr['utime'],
+            'fee': tr['fee'],
+            'data': tr['data'],
+            'hash': tr['transaction_id']['hash'],
+            'lt': tr['transaction_id']['lt'],
+            'in_msg': {
+                'created_lt': tr['in_msg']['created_lt'],
+                'source': self._process_address(tr['in_msg']['source']) if tr['in_msg']['source'] else '',
+                'destination': self._process_address(tr['in_msg']['destination']) if tr['in_msg']['destination'] else '',
+                'value': tr['in_msg']['value'],
+                'msg_data': tr['in_msg']['msg_data']['text'] if 'text' in tr['in_msg']['msg_data'] else tr['in_msg']['msg_data']['body']
+            },
+            'out_msgs': [
+                {
+                    'created_lt': out_msg['created_lt'],
+                    'source': self._process_address(out_msg['source']) if out_msg['source'] else '',
+                    'destination': self._process_address(out_msg['destination']) if out_msg['destination'] else '',
+                    'value': out_msg['value'],
+                    'msg_data': out_msg['msg_data']['text'] if 'text' in out_msg['msg_data'] else out_msg['msg_data']['body']
                 }
-                result.append(Transaction(temp))
-            return result[:limit]
+                for out_msg in tr['out_msgs']
+            ]
+        }
+        return temp
 
     async def get_jetton_data(self, jetton_master_address: str):
-        data = await self.run_get_method(method='get_jetton_data', address=jetton_master_address, stack=[])
-        result = process_jetton_data(data[3][1]['bytes']) if isinstance(process_jetton_data(data[3][1]['bytes']), dict) else await get(process_jetton_data(data[3][1]['bytes']))
+        data = await self.run_get_method_stack(method='get_jetton_data', address=jetton_master_address, stack=[])
+        content = process_jetton_data(data.cell(3))
+        result = content if isinstance(content, dict) else await self.get_metadata(content)
         result['address'] = self._process_address(jetton_master_address)
-        result['supply'] = int(data[0][1], 16)
+        result['supply'] = data.int(0)
+        result['jetton_wallet_code'] = data.boc(4)
 
         return Jetton(result, self)
 
     async def send_boc(self, boc):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'sendBoc'
-            data = {
-                'boc': boc
-            }
-            response = await session.post(url=url, json=data, headers=self.headers)
+        url = self.base_url + 'sendBoc'
+        data = {
+            'boc': boc
+        }
+        async with self.limit(), self.session.post(url=url, json=data, headers=self.headers) as response:
             return response.status
 
     async def get_wallet_seqno(self, address: str):
-        data = await self.run_get_method(address=address, method='seqno', stack=[])
-        return int(data[0][1], 16)
+        data = TonCenterStack(await self._run_get_method(address=address, method='seqno', stack=[]))  # seqno should never be cached
+        return data.int(0)
 
     async def get_balance(self, address: str):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'getAddressBalance'
-            params = {
-                'address': address
-            }
-            response = await session.get(url=url, params=params, headers=self.headers)
+        url = self.base_url + 'getAddressBalance'
+        params = {
+            'address': address
+        }
+        async with self.limit():
+            response = await self.session.get(url=url, params=params, headers=self.headers)
             response = await process_response(response)
-            return int(response['result'])
+        return int(response['result'])
 
     async def get_state(self, address: str):
-        async with aiohttp.ClientSession() as session:
-            url = self.base_url + 'getAddressState'
-            params = {
-                'address': address
-            }
-            response = await session.get(url=url, params=params, headers=self.headers)
+        url = self.base_url + 'getAddressState'
+        params = {
+            'address': address
+        }
+        async with self.limit():
+            response = await self.session.get(url=url, params=params, headers=self.headers)
+            response = await process_response(response)
+        return response['result']
+
+    async def get_code_and_data(self, address: str):
+        url = self.base_url + 'getAddressInformation'
+        params = {
+            'address': address
+        }
+        async with self.limit():
+            response = await self.session.get(url=url, params=params, headers=self.headers)
             response = await process_response(response)
-            return response['result']
+        return {
+            'code': response['result']['code'],
+            'data': response['result']['data'],
+            'last_transaction_lt': response['result']['last_transaction_id']['lt']
+        }
 
     async def get_jetton_wallet_address(self, jetton_master_address: str, owner_address: str):
         cell = Cell()
         cell.bits.write_address(Address(owner_address))
-        data = await self.run_get_method(address=jetton_master_address, method='get_wallet_address', stack=[["tvm.Slice", bytes_to_b64str(cell.to_boc(False))]])
-        jetton_wallet_address = self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[0][1]['bytes']))).to_string())
+        data = await self.run_get_method_stack(address=jetton_master_address, method='get_wallet_address', stack=[["tvm.Slice", bytes_to_b64str(cell.to_boc(False))]])
+        jetton_wallet_address = self._process_address(data.address(0).to_string())
         return jetton_wallet_address
 
     async def get_jetton_wallet(self, jetton_wallet_address: str):
-        data = await self.run_get_method(address=jetton_wallet_address, method='get_wallet_data',stack=[])
+        data = await self.run_get_method_stack(address=jetton_wallet_address, method='get_wallet_data',stack=[])
         wallet = {
             'address': jetton_wallet_address,
-            'balance': int(data[0][1], 16),
-            'owner': self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[1][1]['bytes'])))),
-            'jetton_master_address': self._process_address(read_address(Cell.one_from_boc(base64.b64decode(data[2][1]['bytes'])))),
-            'jetton_wallet_code': data[3][1]['bytes'],
+            'balance': data.int(0),
+            'owner': self._process_address(data.address(1)),
+            'jetton_master_address': self._process_address(data.address(2)),
+            'jetton_wallet_code': data.boc(3),
         }
         return JettonWallet(wallet, self)
@@ -1,12 +1,17 @@
 """ORBS TON ACCESS PART BY @arterialist"""
 
 
+import asyncio
 import time
 from typing import List, Set, Optional
 import random
+import aiohttp
 import requests
 
+from .cache import RequestCoalescer
+
 STALE_PERIOD = 10 * 60 * 1000  # 10 Min
+REFRESH_PERIOD = 60  # seconds to reuse fetched topology in async functions
 
 
 class Nodes:
@@ -22,11 +27,6 @@ class Nodes:
         self.init_time = 0
 
     def init(self, nodes_url: str):
-        self.node_index = -1
-        self.committee.clear()
-        self.topology = []
-        self.init_time = int(time.time() * 1000)
-
         try:
             response = requests.get(nodes_url)
             response.raise_for_status()
@@ -34,6 +34,22 @@ class Nodes:
             topology = data
         except Exception as e:
             raise ValueError(f"exception in fetch({nodes_url}): {e}")
+        self.set_topology(topology)
+
+    async def init_async(self, nodes_url: str, session: aiohttp.ClientSession):
+        try:
+            async with session.get(nodes_url) as response:
+                response.raise_for_status()
+                topology = await response.json(content_type=None)
+        except Exception as e:
+            raise ValueError(f"exception in fetch({nodes_url}): {e}")
+        self.set_topology(topology)
+
+    def set_topology(self, topology: List[dict]):
+        self.node_index = -1
+        self.committee.clear()
+        self.topology = []
+        self.init_time = int(time.time() * 1000)
 
         # remove unhealthy nodes
         for node in topology:
@@ -69,8 +85,15 @@ class Access:
         self.url_version = 1
         self.nodes = Nodes()
 
+    @property
+    def nodes_url(self) -> str:
+        return f"https://{self.host}/mngr/nodes?npm_version=2.3.1"
+
     def init(self):
-        self.nodes.init(f"https://{self.host}/mngr/nodes?npm_version=2.3.1")
+        self.nodes.init(self.nodes_url)
+
+    async def init_async(self, session: aiohttp.ClientSession):
+        await self.nodes.init_async(self.nodes_url, session)
 
     @staticmethod
     def make_protonet(edge_protocol: str, network: str) -> str:
@@ -150,3 +173,36 @@ def get_http_endpoints(config: dict = None, single: bool = False) -> List[str]:
 def get_http_endpoint(config: dict = None) -> str:
     endpoints = get_http_endpoints(config, True)
     return endpoints[0]
+
+
+# fetched topology is shared by all clients of one event loop and fetched again after REFRESH_PERIOD
+_access_coalescers = {}
+
+
+def _get_access_coalescer() -> RequestCoalescer:
+    # coalescer keeps futures, which can't be awaited from another (e.g. next asyncio.run) loop
+    loop = asyncio.get_running_loop()
+    for other in [other for other in _access_coalescers if other.is_closed()]:
+        del _access_coalescers[other]
+    if loop not in _access_coalescers:
+        _access_coalescers[loop] = RequestCoalescer(REFRESH_PERIOD)
+    return _access_coalescers[loop]
+
+
+async def _fetch_access(session: aiohttp.ClientSession = None) -> Access:
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await _fetch_access(session)
+    access = Access()
+    await access.init_async(session)
+    return access
+
+
+async def get_http_endpoint_async(config: dict = None, session: aiohttp.ClientSession = None) -> str:
+    """
+    same as get_http_endpoint, but doesn't block the event loop and reuses fetched topology for REFRESH_PERIOD seconds
+    """
+    network = config.get("network") if config and config.get("network") else "mainnet"
+    suffix = "jsonRPC" if not config or config.get("protocol") != "rest" else ""
+    access = await _get_access_coalescer().run('topology', _fetch_access, session)
+    return access.build_urls(network, "toncenter-api-v2", suffix, True)[0]
@@ -0,0 +1,62 @@
+from functools import lru_cache
+
+from tonsdk.utils import Address
+
+
+ADDRESS_CACHE_SIZE = 100000  # addresses kept by every cached conversion
+
+
+def _as_string(address) -> str:
+    # tonsdk Address isn't hashable by value, raw form is the cheapest string to cache by
+    if isinstance(address, Address):
+        return f'{address.wc}:{address.hash_part.hex()}'
+    return address
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _address_key(address: str):
+    address = Address(address)
+    return address.wc, bytes(address.hash_part)
+
+
+def address_key(address) -> tuple:
+    """
+    canonical (workchain, 32 bytes hash) of address in any form, equal for raw and every friendly form of one address
+    """
+    return _address_key(_as_string(address))
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _format_address(address: str, form: str, testnet: bool):
+    address = Address(address)
+    if form == 'raw':
+        return address.to_string(is_user_friendly=False)
+    elif form == 'user_friendly':
+        if testnet:
+            return address.to_string(True, True, True, True)
+        return address.to_string(True, True, True)  # keeps test only flag of friendly address
+
+
+def format_address(address, form: str = 'user_friendly', testnet: bool = False):
+    """
+    address in any form -> raw or bounceable url safe friendly form, same as providers' _process_address
+    """
+    return _format_address(_as_string(address), form, testnet)
+
+
+def raw_address(address) -> str:
+    return format_address(address, 'raw')
+
+
+def format_addresses(addresses: list, form: str = 'user_friendly', testnet: bool = False) -> list:
+    """
+    bulk format_address, every distinct address is converted once
+    """
+    converted = {}
+    result = []
+    for address in addresses:
+        key = _as_string(address)
+        if key not in converted:
+            converted[key] = format_address(key, form, testnet)
+        result.append(converted[key])
+    return result
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+from .address import raw_address
+
+
+class RequestCoalescer:
+    """
+    Identical requests running at the same time share one request.
+    Finished successful results are reused for `ttl` seconds (0 - only running requests are shared).
+    """
+
+    def __init__(self, ttl: float = 0, maxsize: int = 10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._futures = OrderedDict()  # key: (expires_at, future), expires_at is None while the request is running
+
+    @staticmethod
+    def get_method_key(address: str, method: str, stack: list):
+        return raw_address(address), method, json.dumps(stack, sort_keys=True, default=str)
+
+    def _get(self, key):
+        if key not in self._futures:
+            return None
+        expires_at, future = self._futures[key]
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._futures[key]
+            return None
+        self._futures.move_to_end(key)
+        return future
+
+    async def run(self, key, coro_func, *args, **kwargs):
+        future = self._get(key)
+        if future is None:
+            future = asyncio.ensure_future(coro_func(*args, **kwargs))
+            self._futures[key] = (None, future)
+            future.add_done_callback(lambda f: self._on_done(key, f))
+            while len(self._futures) > self.maxsize:
+                self._futures.popitem(last=False)
+        # shield: cancelling one of the waiters shouldn't cancel the request for others
+        return await asyncio.shield(future)
+
+    def _on_done(self, key, future: asyncio.Future):
+        if self._futures.get(key, (None, None))[1] is not future:
+            return
+        if future.cancelled() or future.exception() is not None or not self.ttl:
+            del self._futures[key]
+        else:
+            self._futures[key] = (time.monotonic() + self.ttl, future)
+
+    def clear(self):
+        self._futures.clear()
+
+
+class AccountCache:
+    """
+    Accounts of one tonlib client (with loaded state and smc id) pinned to masterchain seqno:
+    they are reused until a new masterchain block. seqno is requested at most once in check_interval seconds,
+    set_seqno() or invalidate() can be called explicitly, e.g. when you get a new block.
+    """
+
+    def __init__(self, check_interval: float = 1, maxsize: int = 10000):
+        self.seqno = None
+        self.maxsize = maxsize
+        self._accounts = OrderedDict()  # raw address: account
+        self._seqno_coalescer = RequestCoalescer(check_interval)
+
+    async def sync(self, get_seqno):
+        self.set_seqno(await self._seqno_coalescer.run('seqno', get_seqno))
+
+    def set_seqno(self, seqno: int):
+        if self.seqno is None or seqno > self.seqno:  # cached seqno may be older than explicitly set one
+            self._accounts.clear()
+            self.seqno = seqno
+
+    def get(self, address: str):
+        key = raw_address(address)
+        if key not in self._accounts:
+            return None
+        self._accounts.move_to_end(key)
+        return self._accounts[key]
+
+    def set(self, address: str, account):
+        self._accounts[raw_address(address)] = account
+        while len(self._accounts) > self.maxsize:
+            self._accounts.popitem(last=False)
+
+    def invalidate(self, address: str = None):
+        if address is None:
+            self._accounts.clear()
+        else:
+            self._accounts.pop(raw_address(address), None)
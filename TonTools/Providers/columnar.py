@@ -0,0 +1,148 @@
+import array
+import base64
+import typing
+
+from tonsdk.boc import Cell
+from tonsdk.utils import b64str_to_bytes
+
+from .address import address_key
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('numpy is required for columnar export: pip install TonTools[columnar]')
+    return numpy
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('pyarrow is required for arrow export: pip install TonTools[columnar]')
+    return pyarrow
+
+
+def address_columns(address: str):
+    """
+    (workchain, 32 bytes hash), empty address (e.g. source of external message) is (0, 32 zero bytes)
+    """
+    if not address:
+        return 0, bytes(32)
+    return address_key(address)
+
+
+def op_code(msg_data: str) -> int:
+    """
+    32 bit op code of message body, 0 for text comments, -1 for empty body (same as Msg.try_get_op)
+    """
+    if not msg_data:
+        return -1
+    try:
+        cell = Cell.one_from_boc(b64str_to_bytes(msg_data))
+    except:
+        return 0 if base64.b64decode(msg_data).decode(errors='ignore').split('\x00')[-1] else -1
+    if cell.bits.length < 32:
+        return -1
+    return int.from_bytes(cell.bits.array[:4], 'big')
+
+
+class _Columns:
+    # int columns are array.array, hash columns are bytearray of 32 bytes items
+
+    def __init__(self, ints: typing.Dict[str, str], hashes: typing.Sequence[str]):
+        self.ints = {name: array.array(typecode) for name, typecode in ints.items()}
+        self.hashes = {name: bytearray() for name in hashes}
+        self.length = 0
+
+    def append_message(self, msg: dict):
+        self.ints['value'].append(int(msg['value']))
+        for prefix in ('src', 'dst'):
+            wc, hash_part = address_columns(msg['source' if prefix == 'src' else 'destination'])
+            self.ints[prefix + '_wc'].append(wc)
+            self.hashes[prefix] += hash_part
+        self.ints['op'].append(op_code(msg['msg_data']))
+
+    def to_numpy(self):
+        np = _import_numpy()
+        result = {name: np.frombuffer(column, dtype=column.typecode) for name, column in self.ints.items()}
+        for name, column in self.hashes.items():
+            result[name] = np.frombuffer(column, dtype=np.uint8).reshape(-1, 32)
+        return result
+
+    def to_arrow(self):
+        np = _import_numpy()
+        pa = _import_pyarrow()
+        columns = {}
+        for name, column in self.ints.items():
+            values = np.frombuffer(column, dtype=column.typecode)
+            columns[name] = pa.array(values, mask=values < 0) if name == 'op' else pa.array(values)
+        for name, column in self.hashes.items():
+            columns[name] = pa.FixedSizeBinaryArray.from_buffers(pa.binary(32), len(column) // 32, [None, pa.py_buffer(column)])
+        return pa.RecordBatch.from_pydict(columns)
+
+
+_message_ints = {'value': 'q', 'src_wc': 'b', 'dst_wc': 'b', 'op': 'q'}
+
+
+class TransactionColumns:
+    """
+    Collects transactions into columns without creating Transaction objects.
+    transactions: utime, lt, fee, hash, value, src_wc, src, dst_wc, dst, op of in message
+    out_msgs: tx_lt (lt of parent transaction), value, src_wc, src, dst_wc, dst, op
+    src, dst and hash are 32 bytes, op is -1 (null in arrow) if message has no body
+    """
+
+    def __init__(self):
+        self.transactions = _Columns({'utime': 'q', 'lt': 'Q', 'fee': 'q', **_message_ints}, ('hash', 'src', 'dst'))
+        self.out_msgs = _Columns({'tx_lt': 'Q', **_message_ints}, ('src', 'dst'))
+
+    def __len__(self):
+        return self.transactions.length
+
+    def append(self, tr: dict):
+        """
+        tr is a dict in Transaction(data) format
+        """
+        lt = int(tr['lt'])
+        self.transactions.ints['utime'].append(int(tr['utime']))
+        self.transactions.ints['lt'].append(lt)
+        self.transactions.ints['fee'].append(int(tr['fee']))
+        self.transactions.hashes['hash'] += base64.b64decode(tr['hash'])
+        self.transactions.append_message(tr['in_msg'])
+        self.transactions.length += 1
+        for out_msg in tr['out_msgs']:
+            self.out_msgs.ints['tx_lt'].append(lt)
+            self.out_msgs.append_message(out_msg)
+            self.out_msgs.length += 1
+
+    def to_numpy(self):
+        """
+        returns (transactions, out_msgs) dicts of numpy arrays, arrays share memory with the collected columns,
+        so don't append after export
+        """
+        return self.transactions.to_numpy(), self.out_msgs.to_numpy()
+
+    def to_arrow(self):
+        """
+        returns (transactions, out_msgs) pyarrow.RecordBatch
+        """
+        return self.transactions.to_arrow(), self.out_msgs.to_arrow()
+
+
+async def iter_transaction_batches(transactions: typing.AsyncIterable[dict], batch_size: int = 10000, format: str = 'numpy'):
+    """
+    yields (transactions, out_msgs) columnar batches of at most batch_size transactions,
+    format is 'numpy' (dicts of numpy arrays) or 'arrow' (pyarrow.RecordBatch)
+    """
+    if format not in ('numpy', 'arrow'):
+        raise ValueError(f'unknown format {format}, use numpy or arrow')
+    batch = TransactionColumns()
+    async for tr in transactions:
+        batch.append(tr)
+        if len(batch) >= batch_size:
+            yield batch.to_numpy() if format == 'numpy' else batch.to_arrow()
+            batch = TransactionColumns()
+    if len(batch):
+        yield batch.to_numpy() if format == 'numpy' else batch.to_arrow()
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import os
+import time
+
+import aiohttp
+
+from .metadata import MetadataFetchError
+
+
+default_gateways = (
+    'https://ipfs.io/ipfs/',
+    'https://cloudflare-ipfs.com/ipfs/',
+    'https://gateway.pinata.cloud/ipfs/',
+    'https://dweb.link/ipfs/',
+)
+
+
+def ipfs_path(url: str):
+    """
+    returns cid with path for ipfs:// and http gateway urls, None for other urls
+    """
+    if url.startswith('ipfs://'):
+        return url[len('ipfs://'):]
+    if '/ipfs/' in url:
+        return url.split('/ipfs/', 1)[1]
+    return None
+
+
+class IpfsGateways:
+    """
+    Fetches ipfs content from several gateways. The best ranked gateway is requested first, if it fails or doesn't answer
+    in hedge_delay seconds the next one is requested too (up to hedge gateways at once), the first successful response wins.
+    Gateways are ranked by average latency and error rate.
+    """
+
+    def __init__(self,
+                 gateways: list = default_gateways,  # e.g. put your local gateway 'http://127.0.0.1:8080/ipfs/' first
+                 hedge: int = 2,  # gateways requested at once
+                 hedge_delay: float = 1,  # seconds to wait for a gateway before requesting next one, 0 - request all at once
+                 timeout: float = 10,  # seconds for one gateway request
+                 retries: int = 1,  # times to retry every gateway if all gateways failed
+                 local_dir: str = None  # directory with ipfs content, e.g. from `ipfs get <cid>`, checked before gateways
+                 ):
+        self.gateways = list(gateways)
+        self.hedge = max(1, hedge)
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.retries = retries
+        self.local_dir = local_dir
+        # gateway: {'latency': ewma seconds, 'errors': ewma error rate, 'requests': int}
+        self.stats = {gateway: {'latency': 0, 'errors': 0, 'requests': 0} for gateway in self.gateways}
+
+    def ranked(self):
+        # expected time to get response, failed request costs like timeout
+        # never used gateways have zero latency, so they are tried first (in the order they were given)
+        return sorted(self.gateways, key=lambda g: self.stats[g]['latency'] * (1 - self.stats[g]['errors']) + self.stats[g]['errors'] * self.timeout)
+
+    def _record(self, gateway: str, latency: float = None, alpha: float = 0.2):
+        stats = self.stats[gateway]
+        if latency is not None:
+            stats['latency'] = latency if not stats['requests'] else stats['latency'] * (1 - alpha) + latency * alpha
+        stats['errors'] = stats['errors'] * (1 - alpha) + (alpha if latency is None else 0)
+        stats['requests'] += 1
+
+    def _read_local(self, path: str):
+        if self.local_dir is None:
+            return None
+        root = os.path.realpath(self.local_dir)
+        file_path = os.path.realpath(os.path.join(root, path))
+        if not file_path.startswith(root + os.sep) or not os.path.isfile(file_path):
+            return None
+        with open(file_path, 'rb') as f:
+            return json.loads(f.read())
+
+    async def _fetch(self, gateway: str, path: str, session: aiohttp.ClientSession):
+        start = time.monotonic()
+        try:
+            async with session.get(gateway + path, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                if response.status >= 400:
+                    raise MetadataFetchError(f'{gateway} responded with status {response.status}')
+                value = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, MetadataFetchError):
+            self._record(gateway)
+            raise
+        except asyncio.CancelledError:
+            # another gateway was faster, so this one is at least that slow
+            self._record(gateway, time.monotonic() - start)
+            raise
+        self._record(gateway, time.monotonic() - start)
+        return value
+
+    async def get(self, path: str, session: aiohttp.ClientSession):
+        value = self._read_local(path)
+        if value is not None:
+            return value
+        # every gateway is requested at most retries + 1 times, at most hedge requests are running
+        queue = self.ranked() * (self.retries + 1)
+        tasks = set()
+        errors = []
+        try:
+            while queue or tasks:
+                can_hedge = queue and len(tasks) < self.hedge
+                if can_hedge:
+                    tasks.add(asyncio.ensure_future(self._fetch(queue.pop(0), path, session)))
+                    can_hedge = queue and len(tasks) < self.hedge
+                # wait hedge_delay before requesting next gateway, or until some request is finished
+                done, tasks = await asyncio.wait(tasks, timeout=self.hedge_delay if can_hedge else None, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(repr(task.exception()))
+        finally:
+            for task in tasks:
+                task.cancel()
+        raise MetadataFetchError(f'ipfs {path} failed on all gateways: {errors}')
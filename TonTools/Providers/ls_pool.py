@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from ton import TonlibClient
+
+
+logger = logging.getLogger(__name__)
+
+
+class LiteServerPool:
+    """
+    Spreads requests between TonlibClients connected to different liteservers.
+    A request goes to the server with the lowest latency * (in_flight + 1), at most max_in_flight requests run on one server.
+    Server failed max_errors times in a row is ejected for eject_time seconds and reconnected in background,
+    the last available server is never ejected.
+    """
+
+    def __init__(self,
+                 clients: list,  # initialized TonlibClients
+                 max_in_flight: int = 50,  # requests running on one server, None - unlimited
+                 max_errors: int = 3,  # errors in a row to eject server
+                 eject_time: float = 10  # seconds
+                 ):
+        self.clients = list(clients)
+        self.max_in_flight = max_in_flight
+        self.max_errors = max_errors
+        self.eject_time = eject_time
+        # client index: {'latency': ewma seconds, 'in_flight': int, 'errors': errors in a row, 'ejected_until': monotonic time}
+        self.stats = [{'latency': 0, 'in_flight': 0, 'errors': 0, 'ejected_until': 0} for _ in self.clients]
+        self._condition = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # created lazily to bind to the running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _available(self, now: float):
+        return [i for i, stats in enumerate(self.stats) if stats['ejected_until'] <= now]
+
+    def _pick(self):
+        available = [i for i in self._available(time.monotonic())
+                     if self.max_in_flight is None or self.stats[i]['in_flight'] < self.max_in_flight]
+        if not available:
+            return None
+        return min(available, key=lambda i: (self.stats[i]['latency'] * (self.stats[i]['in_flight'] + 1), self.stats[i]['in_flight']))
+
+    def _record(self, index: int, latency: float = None, alpha: float = 0.2):
+        stats = self.stats[index]
+        if latency is not None:
+            stats['latency'] = latency if not stats['latency'] else stats['latency'] * (1 - alpha) + latency * alpha
+            stats['errors'] = 0
+            return
+        stats['errors'] += 1
+        now = time.monotonic()
+        if stats['errors'] >= self.max_errors and stats['ejected_until'] <= now and len(self._available(now)) > 1:
+            stats['errors'] = 0
+            stats['ejected_until'] = now + self.eject_time
+            asyncio.ensure_future(self._reconnect(index))
+
+    async def _reconnect(self, index: int):
+        client = self.clients[index]
+        logger.warning(f'liteserver #{client.ls_index} ejected, reconnecting')
+        try:
+            await client.reconnect()
+        except Exception as e:
+            logger.warning(f'liteserver #{client.ls_index} failed to reconnect: {e!r}')
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        async with pool.acquire() as client:
+            account = await client.find_account(address)
+        """
+        async with self.condition:
+            index = self._pick()
+            while index is None:
+                now = time.monotonic()
+                # wait for a finished request or for the end of ejection
+                timeout = min((stats['ejected_until'] - now for stats in self.stats if stats['ejected_until'] > now), default=None)
+                try:
+                    await asyncio.wait_for(self.condition.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                index = self._pick()
+            self.stats[index]['in_flight'] += 1
+        start = time.monotonic()
+        try:
+            yield self.clients[index]
+        except Exception:  # tonlib and network errors, LsClientError (e.g. get method exit code) is BaseException
+            self._record(index)
+            raise
+        else:
+            self._record(index, time.monotonic() - start)
+        finally:
+            self.stats[index]['in_flight'] -= 1
+            async with self.condition:
+                self.condition.notify()
+
+
+async def init_clients(config: dict, ls_indexes: list, keystore: str, cdll_path: str = None, **kwargs):
+    """
+    initialized TonlibClients for ls_indexes, every client gets its own keystore directory
+    """
+    clients = [TonlibClient(ls_index=index, config=config, keystore=f'{keystore}-{index}', **kwargs) for index in ls_indexes]
+    await asyncio.gather(*[client.init_tonlib(cdll_path) for client in clients])
+    return clients
@@ -0,0 +1,111 @@
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+
+
+class MetadataFetchError(BaseException):
+    pass
+
+
+class MetadataCache:
+    """
+    LRU cache of offchain metadata with ttl. Stale entries are revalidated with ETag / Last-Modified if server sent them
+    and kept if revalidation fails, failed urls without a good value are cached for negative_ttl seconds. If path is specified entries are also stored in sqlite database.
+
+    Entries are dicts: {'value': json, 'etag': str, 'last_modified': str, 'expires_at': float, 'error': str}
+    """
+
+    def __init__(self,
+                 ttl: float = 3600,  # seconds before entry should be revalidated
+                 maxsize: int = 10000,  # entries in memory
+                 negative_ttl: float = 300,  # seconds to remember failed urls, 0 - don't remember
+                 path: str = None  # sqlite database file
+                 ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self.path = path
+        self._entries = OrderedDict()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, isolation_level=None)  # autocommit
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')  # don't fsync on every write
+            self._db.execute('CREATE TABLE IF NOT EXISTS metadata '
+                             '(url TEXT PRIMARY KEY, value TEXT, etag TEXT, last_modified TEXT, expires_at REAL, error TEXT)')
+
+    def get(self, url: str):
+        """
+        returns entry (fresh or stale) or None
+        """
+        if url in self._entries:
+            self._entries.move_to_end(url)
+            return self._entries[url]
+        if self._db is not None:
+            row = self._db.execute('SELECT value, etag, last_modified, expires_at, error FROM metadata WHERE url = ?', (url, )).fetchone()
+            if row is not None:
+                entry = {
+                    'value': json.loads(row[0]) if row[0] is not None else None,
+                    'etag': row[1],
+                    'last_modified': row[2],
+                    'expires_at': row[3],
+                    'error': row[4]
+                }
+                self._remember(url, entry)
+                return entry
+        return None
+
+    @staticmethod
+    def is_fresh(entry: dict):
+        return entry['expires_at'] > time.time()
+
+    def set(self, url: str, value, etag: str = None, last_modified: str = None):
+        self._store(url, {
+            'value': value,
+            'etag': etag,
+            'last_modified': last_modified,
+            'expires_at': time.time() + self.ttl,
+            'error': None
+        })
+
+    def set_error(self, url: str, error: str):
+        if not self.negative_ttl:
+            return
+        self._store(url, {
+            'value': None,
+            'etag': None,
+            'last_modified': None,
+            'expires_at': time.time() + self.negative_ttl,
+            'error': error
+        })
+
+    def refresh(self, url: str):
+        # server answered 304 Not Modified
+        entry = self.get(url)
+        if entry is not None:
+            entry['expires_at'] = time.time() + self.ttl
+            self._store(url, entry)
+
+    def _remember(self, url: str, entry: dict):
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _store(self, url: str, entry: dict):
+        self._remember(url, entry)
+        if self._db is not None:
+            self._db.execute('INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?)',
+                             (url, json.dumps(entry['value']) if entry['value'] is not None else None, entry['etag'],
+                              entry['last_modified'], entry['expires_at'], entry['error']))
+
+    def clear(self):
+        self._entries.clear()
+        if self._db is not None:
+            self._db.execute('DELETE FROM metadata')
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
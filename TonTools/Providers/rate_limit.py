@@ -0,0 +1,63 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class TokenBucket:
+    def __init__(self, rps: float, burst: int = None):
+        if rps <= 0:
+            raise ValueError('rps should be positive')
+        self.rps = rps
+        self.burst = burst if burst else max(1, int(rps))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()  # waiters get tokens in FIFO order
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rps)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rps)
+                self._refill()
+            self._tokens -= 1
+
+
+class RateLimiter:
+    """
+    Limits requests of one or several providers. Every request takes a token from the global bucket
+    and from the bucket of its api key (if a quota for that key is specified) and holds a concurrency slot until it's finished.
+    """
+
+    def __init__(self,
+                 rps: float = None,  # requests per second for all requests, None - unlimited
+                 burst: int = None,  # max requests sent at once after idle, defaults to rps
+                 max_concurrency: int = None,  # max requests in flight, None - unlimited
+                 quotas: dict = None  # {api_key: rps} or {api_key: (rps, burst)}
+                 ):
+        self.bucket = TokenBucket(rps, burst) if rps else None
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.quotas = {}
+        for key, quota in (quotas or {}).items():
+            self.set_quota(key, *(quota if isinstance(quota, (tuple, list)) else (quota, )))
+
+    def set_quota(self, key: str, rps: float, burst: int = None):
+        self.quotas[key] = TokenBucket(rps, burst)
+
+    @asynccontextmanager
+    async def acquire(self, key: str = None):
+        if self.semaphore is not None:
+            await self.semaphore.acquire()
+        try:
+            if key in self.quotas:
+                await self.quotas[key].acquire()
+            if self.bucket is not None:
+                await self.bucket.acquire()
+            yield
+        finally:
+            if self.semaphore is not None:
+                self.semaphore.release()
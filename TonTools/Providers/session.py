@@ -0,0 +1,127 @@
+import asyncio
+
+import aiohttp
+
+from .rate_limit import RateLimiter
+from .metadata import MetadataCache
+from .ipfs import IpfsGateways
+from .utils import get
+
+
+class ConnectionPool:
+    """
+    One long-lived aiohttp.ClientSession with a keep-alive TCP connector.
+    Cookies are not stored, providers pass their own cookies with each request.
+    Can be owned by a single provider (default) or passed to several providers to share connections.
+    """
+
+    def __init__(self,
+                 limit: int = 100,  # max simultaneous connections, 0 - unlimited
+                 limit_per_host: int = 0,  # max simultaneous connections to one host, 0 - unlimited
+                 keepalive_timeout: float = 30,  # seconds an idle connection is kept open
+                 dns_cache_ttl: int = 300,  # seconds, None - cache forever
+                 timeout: float = 300  # total timeout of one request in seconds, same as aiohttp default
+                 ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = timeout
+        self._session = None
+        self._loop = None  # event loop the session was created on
+
+    def _detach(self):
+        # session of another (e.g. closed by asyncio.run) loop can't be closed from the current one
+        if self._session is not None and not self._session.closed:
+            self._session.detach()
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # session is created lazily because aiohttp requires a running event loop,
+        # and again if the client is used in another event loop
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._loop is not loop:
+            self._detach()
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                cookie_jar=aiohttp.DummyCookieJar(),  # session can be shared, cookies are passed per request (e.g. dton login)
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._loop = loop
+        return self._session
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    async def close(self):
+        if not self.closed and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._detach()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class PooledClient:
+    """
+    Mixin for providers doing http requests. Use `await client.close()` or `async with client:` to release connections.
+    """
+    pool: ConnectionPool
+    _own_pool: bool
+    rate_limiter: RateLimiter
+    rate_limit_key: str
+    metadata_cache: MetadataCache
+    ipfs_gateways: IpfsGateways
+
+    def _set_pool(self, pool: ConnectionPool = None):
+        self._own_pool = pool is None
+        self.pool = pool if pool is not None else ConnectionPool()
+
+    def _set_rate_limiter(self, rate_limiter: RateLimiter = None, key: str = None):
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.rate_limit_key = key
+
+    def _set_metadata_cache(self, metadata_cache: MetadataCache = None):
+        # False disables caching
+        self.metadata_cache = metadata_cache if metadata_cache is not None else MetadataCache()
+
+    def _set_ipfs_gateways(self, ipfs_gateways: IpfsGateways = None):
+        self.ipfs_gateways = ipfs_gateways if ipfs_gateways is not None else IpfsGateways()
+
+    async def get_metadata(self, url: str):
+        return await get(url, self.session, self.metadata_cache or None, self.ipfs_gateways)
+
+    def limit(self):
+        """
+        async with self.limit():
+            response = await self.session.get(...)
+        """
+        return self.rate_limiter.acquire(self.rate_limit_key)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return self.pool.session
+
+    async def close(self):
+        # shared pool is closed by its owner
+        if self._own_pool:
+            await self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,124 @@
+import abc
+from base64 import b64decode
+
+from tonsdk.boc import Cell, Slice
+from ton.utils.cell import read_address
+
+
+class GetMethodStack(abc.ABC):
+    """
+    Result stack of a get method. Entries are decoded lazily and every entry is decoded only once:
+    stack.int(0), stack.cell(1), stack.address(2) can be called any number of times.
+    Raw provider response is available as stack.raw
+    """
+
+    def __init__(self, entries: list):
+        self.raw = entries
+        self._decoded = {}  # (kind, index): value
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __getitem__(self, index):
+        return self.raw[index]
+
+    def _decode(self, kind: str, index: int, func):
+        key = (kind, index)
+        if key not in self._decoded:
+            self._decoded[key] = func(index)
+        return self._decoded[key]
+
+    @staticmethod
+    @abc.abstractmethod
+    def _parse_int(entry) -> int:
+        pass
+
+    @staticmethod
+    @abc.abstractmethod
+    def _parse_boc(entry) -> str:
+        pass
+
+    def int(self, index: int) -> int:
+        return self._decode('int', index, lambda i: self._parse_int(self.raw[i]))
+
+    def boc(self, index: int) -> str:
+        """
+        base64 boc of cell or slice entry
+        """
+        return self._decode('boc', index, lambda i: self._parse_boc(self.raw[i]))
+
+    def cell(self, index: int) -> Cell:
+        # cell is shared between calls, don't modify it
+        return self._decode('cell', index, lambda i: Cell.one_from_boc(b64decode(self.boc(i))))
+
+    def slice(self, index: int) -> Slice:
+        # slices are consumed by reading, so every call returns a new one
+        return self.cell(index).begin_parse()
+
+    def address(self, index: int):
+        """
+        tonsdk Address stored in the slice entry or None
+        """
+        return self._decode('address', index, lambda i: read_address(self.cell(i)))
+
+
+class TonCenterStack(GetMethodStack):
+    # ['num', '0x1'], ['cell', {'bytes': b64, 'object': ...}]
+
+    @staticmethod
+    def _parse_int(entry) -> int:
+        return int(entry[1], 16)
+
+    @staticmethod
+    def _parse_boc(entry) -> str:
+        return entry[1]['bytes']
+
+
+class TonlibStack(GetMethodStack):
+    # tvm.stackEntryNumber, tvm.stackEntryCell
+
+    @staticmethod
+    def _parse_int(entry) -> int:
+        return int(entry.number.number)
+
+    @staticmethod
+    def _parse_boc(entry) -> str:
+        return entry.cell.bytes
+
+
+class DtonStack(GetMethodStack):
+    # {'value_type': 'num', 'value': '1'}, {'value_type': 'cell', 'value': b64}
+
+    @staticmethod
+    def _parse_int(entry) -> int:
+        return int(entry['value'])
+
+    @staticmethod
+    def _parse_boc(entry) -> str:
+        return entry['value']
+
+
+def unique_calls(calls: list, key):
+    """
+    [(address, method, stack), ...] -> (calls without duplicates, index of unique call for every call)
+    """
+    unique, indexes, positions = [], [], {}
+    for call in calls:
+        call_key = key(*call)
+        if call_key not in positions:
+            positions[call_key] = len(unique)
+            unique.append(call)
+        indexes.append(positions[call_key])
+    return unique, indexes
+
+
+def collect_results(results: list, indexes: list, return_exceptions: bool):
+    """
+    results of unique calls (stacks or exceptions) -> results in order of calls, raises first exception if not return_exceptions
+    """
+    results = [results[i] for i in indexes]
+    if not return_exceptions:
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+    return results
@@ -4,13 +4,17 @@ from base64 import b64decode
 import aiohttp
 
 import asyncio
+import copy
+import typing
 from tonsdk.boc import Cell
-from tonsdk.utils import Address, bytes_to_b64str, b64str_to_bytes
 
 from ton.account import Account
 from ton import TonlibClient
 from ton.utils.cell import read_address
 
+from .metadata import MetadataCache, MetadataFetchError
+from .ipfs import IpfsGateways, ipfs_path
+
 
 def is_hex(str):
     try:
@@ -21,16 +25,26 @@ def is_hex(str):
 
 
 def process_jetton_data(data):
-    if not len(Cell.one_from_boc(b64decode(data)).refs):
-        url = Cell.one_from_boc(b64decode(data)).bits.get_top_upped_array().decode().split('\x01')[-1]
+    """
+    data is jetton content as base64 boc or already parsed Cell, returns offchain url or onchain metadata dict
+    """
+    cell = data if isinstance(data, Cell) else Cell.one_from_boc(b64decode(data))
+    if not len(cell.refs):
+        url = cell.bits.get_top_upped_array().decode().split('\x01')[-1]
         return url
     else:
-        symbol = Cell.one_from_boc(b64decode(data)).refs[0].refs[1].refs[0].refs[1].refs[0].bits.get_top_upped_array().decode().split('\x00')[-1]
-        desc1 = unicodedata.normalize("NFKD", Cell.one_from_boc(b64decode(data)).refs[0].refs[1].refs[1].refs[0].refs[0].bits.get_top_upped_array().decode().split('\x00')[-1])  # Cell.one_from_boc(b64decode(data)).refs[0].refs[1].refs[1].refs[0].refs
-        desc2 = unicodedata.normalize("NFKD", Cell.one_from_boc(b64decode(data)).refs[0].refs[1].refs[1].refs[0].refs[0].refs[0].bits.get_top_upped_array().decode().split('\x00')[-1]) if len(Cell.one_from_boc(b64decode(data)).refs[0].refs[1].refs[1].refs[0].refs[0].refs) else ''
-        decimals = Cell.one_from_boc(b64decode(data)).refs[0].refs[1].refs[1].refs[1].refs[0].bits.get_top_upped_array().decode().split('\x00')[-1]
-        name = Cell.one_from_boc(b64decode(data)).refs[0].refs[1].refs[0].refs[0].refs[0].bits.get_top_upped_array().decode().split('\x00')[-1]
-        image = Cell.one_from_boc(b64decode(data)).refs[0].refs[0].refs[0].bits.get_top_upped_array().decode().split('\x00')[-1]
+        def read(c):
+            return c.bits.get_top_upped_array().decode().split('\x00')[-1]
+
+        content = cell.refs[0]
+        left, right = content.refs[1].refs[0], content.refs[1].refs[1]
+        desc_cell = right.refs[0].refs[0]
+        symbol = read(left.refs[1].refs[0])
+        desc1 = unicodedata.normalize("NFKD", read(desc_cell))
+        desc2 = unicodedata.normalize("NFKD", read(desc_cell.refs[0])) if len(desc_cell.refs) else ''
+        decimals = read(right.refs[1].refs[0])
+        name = read(left.refs[0].refs[0])
+        image = read(content.refs[0].refs[0])
         return {
             'name': name,
             'description': desc1 + desc2,
@@ -40,12 +54,93 @@ def process_jetton_data(data):
         }
 
 
-async def get(url: str):
-    if 'ipfs' in url:
-        url = 'https://ipfs.io/ipfs/' + url.split('ipfs://')[-1]
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            return await response.json(content_type=None)
+async def get(url: str, session: aiohttp.ClientSession = None, cache: MetadataCache = None, ipfs_gateways: IpfsGateways = None):
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await get(url, session, cache, ipfs_gateways)
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry):
+        if entry['error'] is not None:
+            raise MetadataFetchError(f'{url} failed recently: {entry["error"]}')
+        return copy.deepcopy(entry['value'])  # providers modify metadata dicts
+    headers = {}
+    if entry is not None and entry['error'] is None:
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+    path = ipfs_path(url)
+    etag = last_modified = None
+    try:
+        if path is not None and ipfs_gateways is not None:
+            value = await ipfs_gateways.get(path, session)  # ipfs content is immutable, no need to revalidate it
+        else:
+            request_url = url if path is None else 'https://ipfs.io/ipfs/' + path
+            async with session.get(request_url, headers=headers) as response:
+                if response.status == 304 and headers:
+                    cache.refresh(url)
+                    return copy.deepcopy(entry['value'])
+                if response.status >= 400:
+                    raise MetadataFetchError(f'{url} responded with status {response.status}')
+                value = await response.json(content_type=None)
+                etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, MetadataFetchError) as e:
+        if entry is not None and entry['error'] is None:
+            return copy.deepcopy(entry['value'])  # revalidation failed, the last good value is kept and returned
+        if cache is not None:
+            cache.set_error(url, repr(e))
+        raise
+    if cache is not None:
+        cache.set(url, copy.deepcopy(value), etag, last_modified)
+    return value
+
+
+async def iter_bounded(func: typing.Callable[..., typing.Awaitable], args: typing.Iterable, max_in_flight: int = 100, ordered: bool = True):
+    """
+    yields (arg, await func(arg)) keeping at most max_in_flight calls running, a new call starts as soon as one is finished.
+    if ordered is False results are yielded as they resolve, otherwise in order of args.
+    """
+    args = iter(args)
+    pending = {}  # task: arg, dicts keep insertion order
+
+    def start_next():
+        for arg in args:
+            pending[asyncio.ensure_future(func(arg))] = arg
+            return
+
+    try:
+        for _ in range(max_in_flight):
+            start_next()
+        while pending:
+            if ordered:
+                done = [next(iter(pending))]
+                await done[0]
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                arg = pending.pop(task)
+                start_next()
+                yield arg, task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def iter_pages(fetch_page: typing.Callable[..., typing.Awaitable], cursor=None):
+    """
+    yields pages of fetch_page(cursor) -> (page, next_cursor), next_cursor is None for the last page.
+    next page is requested before current one is yielded, so fetching overlaps with processing, at most 2 pages are kept.
+    """
+    task = asyncio.ensure_future(fetch_page(cursor))
+    try:
+        while task is not None:
+            page, cursor = await task
+            task = asyncio.ensure_future(fetch_page(cursor)) if cursor is not None else None
+            yield page
+    finally:
+        if task is not None:
+            task.cancel()
+
 
 markets_adresses = {
     '0:584ee61b2dff0837116d0fcb5078d93964bcbe9c05fd6a141b1bfca5d6a43e18': 'Getgems Sales',
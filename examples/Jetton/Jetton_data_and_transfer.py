@@ -34,6 +34,8 @@ async def main():
     else:
         await my_wallet.transfer_jetton_by_jetton_wallet(destination_address='address', jetton_wallet='your jetton wallet address', jettons_amount=1000, fee=0.1)  # for all clients
 
+    await client.close()
+
 
 if __name__ == '__main__':
     asyncio.run(main())
\ No newline at end of file
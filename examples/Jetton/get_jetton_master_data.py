@@ -16,5 +16,7 @@ async def main():
 
     print(jetton_master_data)
 
+    await client.close()
+
 if __name__ == '__main__':
     asyncio.run(main())
\ No newline at end of file
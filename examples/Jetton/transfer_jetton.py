@@ -20,5 +20,7 @@ async def main():
 
     print('done')
 
+    await client.close()
+
 if __name__ == '__main__':
     asyncio.run(main())
\ No newline at end of file
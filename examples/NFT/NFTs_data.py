@@ -1,5 +1,7 @@
 import asyncio
 
+from ton.utils.cell import read_address
+
 from TonTools import *
 
 
@@ -46,6 +48,8 @@ async def main():
     transactions = await owner.get_transactions(limit=3)
     print(' '.join([str(tr) for tr in transactions]))  # Transaction({"type": "out", "utime": 1677531709, "hash": "h+lVX0qK4T76QtRqC0FWWGhLptgPLM4MjSEbgKODcFc=", "value": 2500.0, "from": "EQBZVBXBpirFPOQ5Wmgi5Es2hDCRAfiT3i5JRy_gVsJOlpZv", "to": "EQBfAN7LfaUYgXZNw5Wc7GBgkEX2yhuJ5ka95J1JJwXXf4a8", "comment": "6017835"}) Transaction({"type": "in", "utime": 1677413260, "hash": "erk0nLWW9W3m9boFM+/9v0YSeRz1jJvpyiRQYEgN5AE=", "value": 1e-09, "from": "EQCPGzW1dJURRybL41Q3KYfzX4fZdQUeY8-7-TKyeR7f-7cU", "to": "EQBZVBXBpirFPOQ5Wmgi5Es2hDCRAfiT3i5JRy_gVsJOlpZv", "comment": ""}) Transaction({"type": "in", "utime": 1677302980, "hash": "FNlzXOtraIjp9iAj6zPdTqrMI++NNgFRpGoxSJ0ez/k=", "value": 10000.098804, "from": "EQCOj4wEjXUR59Kq0KeXUJouY5iAcujkmwJGsYX7qPnITEAM", "to": "EQBZVBXBpirFPOQ5Wmgi5Es2hDCRAfiT3i5JRy_gVsJOlpZv", "comment": ""})
 
+    await client.close()
+
 
 if __name__ == '__main__':
     asyncio.run(main())
\ No newline at end of file
@@ -11,6 +11,8 @@ async def main():
 
     print(data[0])
 
+    await client.close()
+
 
 if __name__ == '__main__':
     asyncio.run(main())
\ No newline at end of file
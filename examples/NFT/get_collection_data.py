@@ -15,6 +15,8 @@ async def main():
         
     print(data)
 
+    await client.close()
+
 
 if __name__ == '__main__':
     asyncio.run(main())
\ No newline at end of file
@@ -12,5 +12,7 @@ async def main():
     resp = await my_wallet.transfer_nft(destination_address='EQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAM9c', nft_address='EQABEmkuk9B91i0CudxiV7jBeCzvF5UHJdAYHOCETLtx3DGX')
     print(resp)  # 200
 
+    await client.close()
+
 if __name__ == '__main__':
     asyncio.run(main())
\ No newline at end of file
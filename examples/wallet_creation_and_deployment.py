@@ -34,7 +34,7 @@ async def main():
 
         print(await new_wallet.get_state())  # active
 
-        return await new_wallet.get_state()
+    await client.close()
 
 
 if __name__ == '__main__':
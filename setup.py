@@ -13,4 +13,5 @@ setup(
     author_email='cyrbatoff@gmail.com',
     description='Explore TON Blockchain with python',
     install_requires=requirements,
+    extras_require={'columnar': ['numpy', 'pyarrow']},
 )
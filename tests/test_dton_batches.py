@@ -0,0 +1,56 @@
+import asyncio
+
+import graphql
+
+from TonTools.Providers.DtonClient import DtonClient
+
+
+ADDRESS = 'EQCD39VS5jcptHL8vMjEXrzGaRcCVYto7HUn4bpAOg8xqB2N'
+HASH_PART = '00' * 32
+
+ROW = {
+    'account_storage_balance_grams': '5',
+    'account_state_type': 'active',
+    'account_state_state_init_code': 'code',
+    'account_state_state_init_data': 'data',
+    'parsed_nft_index': '1',
+    'parsed_nft_collection_address_workchain': 0,
+    'parsed_nft_collection_address_address': HASH_PART,
+    'parsed_nft_owner_address_workchain': 0,
+    'parsed_nft_owner_address_address': HASH_PART,
+    'parsed_owner_is_seller': False,
+    'parsed_nft_content_offchain_url': None,
+}
+
+
+class RecordingClient(DtonClient):
+    # answers every aliased root with one row and keeps sent documents
+
+    def __init__(self):
+        super().__init__(login=False)
+        self.sent = []
+
+    async def send_query(self, graphql_query: str, variables=None):
+        roots = graphql.parse(graphql_query).definitions[0].selection_set.selections
+        self.sent.append((graphql_query, variables))
+        return {root.alias.value: [ROW] for root in roots}
+
+
+def test_batched_methods_send_valid_documents():
+    client = RecordingClient()
+
+    async def run():
+        assert await client.get_balances([ADDRESS, ADDRESS]) == [5, 5]
+        assert await client.get_states([ADDRESS]) == ['active']
+        assert await client.get_code_and_data(ADDRESS) == {'code': 'code', 'data': 'data'}
+        items = await client.get_nft_items([ADDRESS, ADDRESS])
+        assert [item.index for item in items] == [1, 1]
+
+    asyncio.run(run())
+    assert len(client.sent) == 4
+    balances, _ = client.sent[0]
+    assert 'q0: account_states(' in balances and 'q1: account_states(' in balances
+    assert 'order_by: "gen_utime"' in balances
+    nft_items, variables = client.sent[3]
+    assert 'q1: transactions(' in nft_items
+    assert variables['q0_account_address_friendly'] == ADDRESS
@@ -0,0 +1,78 @@
+import graphql
+
+from TonTools.Providers.DtonClient import DtonClient
+
+
+# documents rendered by the baseline DtonClient.process_args for the same arguments, without aliases
+BASELINE_ACCOUNT_STATES = '''query {
+  account_states(
+    address: "AB"
+    workchain: 0
+    order_by: "gen_utime"
+    page_size: 1
+    page: 0
+    parsed_owner_is_seller: true
+  ) {
+    address
+  }
+}'''
+
+BASELINE_RUN_METHOD = '''query {
+  run_method(
+    account_search_by_address: {
+      address_friendly: "EQxx"
+    }
+    method_name: "get_nft_content"
+    stack: [
+      {
+        value_type: "num"
+        value: "5"
+      }
+      {
+        value_type: "cell"
+        value: "te6c"
+      }
+    ]
+  ) {
+    success
+  }
+}'''
+
+ACCOUNT_STATES = ('account_states', ['address'], {'address': 'AB', 'workchain': 0, 'order_by': 'gen_utime',
+                                                  'page_size': 1, 'page': 0, 'parsed_owner_is_seller': True})
+RUN_METHOD = ('run_method', ['success'], {'account_search_by_address': {'address_friendly': 'EQxx'}, 'method_name': 'get_nft_content',
+                                          'stack': [{'value_type': 'num', 'value': '5'}, {'value_type': 'cell', 'value': 'te6c'}]})
+
+
+def render(client: DtonClient, table_name: str, fields: list, kwargs: dict):
+    variables = {}
+    document = client._render_document('query', [(table_name, fields, client._parameterize(kwargs, 'q0', variables))])
+    graphql.parse(document)
+    return document, variables
+
+
+def test_inline_arguments_match_baseline():
+    client = DtonClient(login=False)
+    client.argument_types = {}
+    for query, baseline in ((ACCOUNT_STATES, BASELINE_ACCOUNT_STATES), (RUN_METHOD, BASELINE_RUN_METHOD)):
+        document, variables = render(client, *query)
+        assert document.replace('q0: ', '') == baseline
+        assert variables == {}
+
+
+def test_known_arguments_are_variables():
+    client = DtonClient(login=False)
+    document, variables = render(client, *ACCOUNT_STATES)
+    assert variables == {'q0_address': 'AB', 'q0_workchain': 0, 'q0_page_size': 1, 'q0_page': 0}
+    assert 'order_by: "gen_utime"' in document
+    assert 'parsed_owner_is_seller: true' in document
+    document, variables = render(client, *RUN_METHOD)
+    assert variables['q0_method_name'] == 'get_nft_content'
+    assert 'value_type: "num"' in document and 'value: "5"' in document
+
+
+def test_strings_are_escaped():
+    client = DtonClient(login=False)
+    document, _ = render(client, 'transactions', ['lt'], {'comment': 'he said "hi"', 'lt': None})
+    assert 'comment: "he said \\"hi\\""' in document
+    assert 'lt: null' in document
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from TonTools.Providers.metadata import MetadataCache, MetadataFetchError
+from TonTools.Providers.utils import get
+
+
+def test_failed_revalidation_keeps_good_value():
+    state = {'fail': False}
+
+    async def handler(request):
+        if state['fail']:
+            return web.Response(status=503)
+        return web.json_response({'name': 'item'})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/metadata.json', handler)
+        server = TestServer(app)
+        await server.start_server()
+        url = str(server.make_url('/metadata.json'))
+        cache = MetadataCache(ttl=0)  # every entry is stale at once
+        try:
+            assert await get(url, cache=cache) == {'name': 'item'}
+            state['fail'] = True
+            assert await get(url, cache=cache) == {'name': 'item'}
+            assert cache.get(url)['error'] is None
+            with pytest.raises(MetadataFetchError):
+                await get(url.replace('metadata', 'missing'), cache=cache)
+            assert cache.get(url.replace('metadata', 'missing'))['error'] is not None
+        finally:
+            await server.close()
+
+    asyncio.run(run())